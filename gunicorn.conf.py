@@ -0,0 +1,37 @@
+# 운영 모드 실행 설정
+#   APP_ENV=production python main.py
+#   또는 gunicorn -c gunicorn.conf.py main:app
+#
+# 무중단 재시작 (코드 배포 / 카탈로그 갱신)
+#   kill -USR2 <master pid>  : 새 마스터(새 코드 + 카탈로그 재로드) 기동,
+#                              새 워커가 뜨면 kill -WINCH <기존 master pid> 후 kill -TERM <기존 master pid>
+#   kill -HUP  <master pid>  : 워커 전체를 한꺼번에 새로 fork 할 뿐, preload_app 이라
+#                              마스터에 올라간 코드/카탈로그는 그대로 (배포·카탈로그 갱신에 쓰면 안 됨)
+import multiprocessing
+
+from utils.config import config
+
+bind = f"{config.SERVER_HOST}:{config.SERVER_PORT}"
+workers = config.SERVER_WORKERS or multiprocessing.cpu_count()
+worker_class = "utils.server.ProductionUvicornWorker"
+
+# 앱/카탈로그를 마스터에서 한 번만 로드하고 워커는 fork 로 공유 (copy-on-write)
+preload_app = True
+
+graceful_timeout = config.SERVER_GRACEFUL_TIMEOUT
+timeout = 60
+keepalive = 5
+max_requests = config.SERVER_MAX_REQUESTS
+max_requests_jitter = max_requests // 10 if max_requests else 0
+
+
+def when_ready(server):
+    # 워커 fork 직전 (마스터): 카탈로그 로드 후 GC freeze
+    from main import preload_catalog
+    preload_catalog()
+
+
+def post_fork(server, worker):
+    # 워커: 마스터에서 만든 네트워크 클라이언트는 공유하지 않고 새로 생성
+    from main import reset_clients_after_fork
+    reset_clients_after_fork()
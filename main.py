@@ -1,14 +1,100 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from routers import kakao_webhook
 from routers import kakao_store
 from routers import kakao_recommend
-import uvicorn
+from routers import admin
+from routers import internal
+from services.catalog_service import catalog
+from services.geo_shard import shard_router
+from services.event_log import event_log
+from services.gazetteer import gazetteer
+from services.kakao_service import KakaoService
+from services.warmup import warmup
+from services.profiler import RequestProfilerMiddleware, loop_monitor, request_profiler
+from services.traffic_capture import TrafficCapture, TrafficCaptureMiddleware
+from utils.config import config
+
+
+def _pinecone_services():
+    # 라우터마다 따로 만든 인스턴스 (같은 객체는 한 번만)
+    services = (kakao_webhook.pinecone_service, kakao_store.pinecone_service, kakao_recommend.pinecone)
+    return list({id(s): s for s in services}.values())
+
+
+async def _warm_pinecone():
+    # 연결 + 인덱스 확인 + 1건 쿼리를 인스턴스별로 동시에
+    results = await asyncio.gather(*(asyncio.to_thread(s.warm_up) for s in _pinecone_services()))
+    return results[0]
+
+
+async def _warm_openai():
+    # SDK 로드 + 클라이언트 생성 + 가벼운 요청으로 커넥션 준비
+    # (클라이언트는 프로세스 공용이라 한 번만)
+    client = await asyncio.to_thread(lambda: kakao_store.openai_service.client)
+    await client.models.retrieve(config.OPENAI_FAST_MODEL)
+    return {"model": config.OPENAI_FAST_MODEL}
+
+
+def _catalog_required() -> bool:
+    # 샤드 노드는 담당 지역을 카탈로그로만 검색하므로 카탈로그 없이는 준비 안 됨
+    return config.CATALOG_PRELOAD or not shard_router.all_local
+
+
+async def _warm_catalog():
+    # 운영 모드는 마스터가 fork 전에 이미 로드 (개발 모드/마스터 로드 실패 시에만 여기서)
+    sharded = not shard_router.all_local
+    if _catalog_required() and (not catalog.loaded or (sharded and len(catalog) == 0)):
+        await asyncio.to_thread(catalog.load_from_pinecone, kakao_store.pinecone_service,
+                                keep=shard_router.owns_store)
+    if sharded and len(catalog) == 0:
+        raise RuntimeError("sharded node loaded an empty catalog")
+    return {"stores": len(catalog)}
+
+
+async def _warm_local_caches():
+    count = await asyncio.to_thread(lambda: len(gazetteer.places()))
+    KakaoService.http_client()
+    return {"landmarks": count}
+
+
+warmup.add("pinecone", _warm_pinecone)
+warmup.add("openai", _warm_openai, required=False)
+warmup.add("catalog", _warm_catalog, required=_catalog_required())
+warmup.add("local_caches", _warm_local_caches, required=False)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 워커마다: 루프 지연 측정, 이벤트 기록 스레드 시작
+    loop_monitor.start()
+    event_log.start()
+    if capture is not None:
+        capture.writer.start()
+    # 준비 작업은 백그라운드로 동시에 실행 → 끝나면 /kakao/ready 가 200
+    warmup_task = asyncio.create_task(warmup.run())
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        await warmup.stop()
+        await loop_monitor.stop()
+        await shard_router.aclose()
+        await KakaoService.aclose()
+        event_log.close()
+        if capture is not None:
+            capture.writer.close()
+
 
 app = FastAPI(
     title="Restaurant Chatbot API",
     description="카카오톡 맛집 추천 챗봇 API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,  # 기본 응답을 orjson 으로 직렬화
+    lifespan=lifespan,
 )
 
 # CORS 설정
@@ -24,6 +110,19 @@ app.add_middleware(
 app.include_router(kakao_webhook.router)
 app.include_router(kakao_store.router)
 app.include_router(kakao_recommend.router)
+app.include_router(admin.router)
+app.include_router(internal.router)
+
+# /admin/profile/requests 로 켰을 때만 cProfile 수집
+app.add_middleware(RequestProfilerMiddleware, profiler=request_profiler)
+
+
+# 운영 트래픽 샘플 수집 (CAPTURE_ENABLED=true 일 때만, 가장 바깥에서 원본 바디 기록)
+capture = None
+if config.CAPTURE_ENABLED:
+    capture = TrafficCapture(config.CAPTURE_DIR, config.CAPTURE_SAMPLE_RATE, config.CAPTURE_SALT)
+    app.add_middleware(TrafficCaptureMiddleware, capture=capture)
+
 
 @app.get("/")
 async def root():
@@ -34,9 +133,37 @@ async def root():
             "kakao_webhook": "/kakao/webhook",
             "kakao_webhook": "/kakao/store",
             "kakao_webhook": "/kakao/recommend",
-            "health": "/kakao/health"
+            "health": "/kakao/health",
+            "ready": "/kakao/ready"
         }
     }
 
+def preload_catalog():
+    """운영 모드 마스터 프로세스에서 fork 전에 한 번 호출"""
+    if _catalog_required() and not catalog.loaded:
+        try:
+            # 이 노드 담당 지역(LOCAL_SHARDS) 상점만 적재
+            catalog.load_from_pinecone(kakao_store.pinecone_service, keep=shard_router.owns_store)
+        except Exception as e:
+            # 워커의 catalog 준비 단계에서 다시 시도 (성공할 때까지 /kakao/ready 는 503)
+            print(f"[CATALOG] preload failed: {e}")
+    catalog.freeze()
+
+
+def reset_clients_after_fork():
+    """워커 프로세스 시작 시 호출: 라우터별 서비스의 커넥션 재생성"""
+    for svc in _pinecone_services():
+        svc.reconnect()
+    for svc in (kakao_webhook.openai_service, kakao_store.openai_service):
+        svc.reconnect()
+    KakaoService._http = None
+
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    if config.APP_ENV == "production":
+        # gunicorn 마스터 + uvloop/httptools 워커 (설정은 gunicorn.conf.py)
+        import os
+        os.execvp("gunicorn", ["gunicorn", "-c", "gunicorn.conf.py", "main:app"])
+    else:
+        import uvicorn
+        uvicorn.run("main:app", host=config.SERVER_HOST, port=config.SERVER_PORT, reload=True)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
 from datetime import time
 
 # 음식점 메뉴 항목
@@ -39,6 +39,57 @@ class KakaoParams(BaseModel):
     sys_location: Optional[str] = None
     food: Optional[str] = None        
     location: Optional[str] = None     
+    store_name: Optional[str] = None
+
+# 오픈빌더 스킬 요청 (필요한 필드만 선언, 나머지는 무시)
+# 오픈빌더는 빈 값을 null 로 보내는 경우가 있어 전부 Optional 로 두고 속성에서 기본값 처리.
+# (mode="before" 검증기를 쓰면 파이썬 함수 호출이 끼어 json.loads + dict.get 보다 느려짐)
+class KakaoUser(BaseModel):
+    id: Optional[str] = ""
+
+class KakaoBlock(BaseModel):
+    id: Optional[str] = ""
+    name: Optional[str] = ""
+
+class KakaoUserRequest(BaseModel):
+    utterance: Optional[str] = ""
+    user: Optional[KakaoUser] = None
+    block: Optional[KakaoBlock] = None
+
+class KakaoAction(BaseModel):
+    params: Optional[KakaoParams] = None
+    clientExtra: Optional[Dict[str, Any]] = None
+    client_extra: Optional[Dict[str, Any]] = None  # 일부 블록은 client_extra 로 넘어옴
+
+_EMPTY_PARAMS = KakaoParams()
+
+class KakaoSkillRequest(BaseModel):
+    userRequest: Optional[KakaoUserRequest] = None
+    action: Optional[KakaoAction] = None
+
+    @property
+    def user_key(self) -> str:
+        user = self.userRequest.user if self.userRequest else None
+        return (user.id or "") if user else ""
+
+    @property
+    def block_id(self) -> str:
+        block = self.userRequest.block if self.userRequest else None
+        return (block.id or "") if block else ""
+
+    @property
+    def utterance(self) -> str:
+        return ((self.userRequest.utterance if self.userRequest else None) or "").strip()
+
+    @property
+    def params(self) -> KakaoParams:
+        return (self.action.params if self.action else None) or _EMPTY_PARAMS
+
+    @property
+    def client_extra(self) -> Dict[str, Any]:
+        if not self.action:
+            return {}
+        return self.action.clientExtra or self.action.client_extra or {}
 
 class KakaoResponse(BaseModel):
     version: str = "2.0"
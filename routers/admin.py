@@ -0,0 +1,50 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from services.profiler import loop_monitor, request_profiler, sample_stacks
+from utils.config import config
+
+
+def require_admin(x_admin_token: str = Header(default="")):
+    """X-Admin-Token 헤더 확인 (ADMIN_TOKEN 미설정 시 전부 거부)"""
+    if not config.ADMIN_TOKEN or not hmac.compare_digest(x_admin_token, config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="forbidden")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/loop-lag")
+async def loop_lag():
+    """이벤트 루프 지연/정지 기록"""
+    return loop_monitor.stats()
+
+
+@router.post("/profile/sample")
+async def profile_sample(seconds: float = Query(10.0, gt=0, le=120), interval_ms: float = Query(5.0, ge=1)):
+    """지정 시간 동안 스택 샘플링 → folded stack 파일 (flamegraph.pl, speedscope)"""
+    folded = await sample_stacks(seconds, interval_ms / 1000)
+    return PlainTextResponse(folded, headers={"Content-Disposition": 'attachment; filename="stacks.folded"'})
+
+
+@router.post("/profile/requests")
+async def profile_requests(count: int = Query(20, gt=0, le=10000)):
+    """다음 count 개 요청 동안 cProfile 수집 시작"""
+    try:
+        request_profiler.arm(count)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "armed", "requests": count}
+
+
+@router.get("/profile/requests")
+async def profile_requests_result():
+    """수집된 cProfile 결과 다운로드 (.prof)"""
+    if request_profiler.result is None:
+        status = "running" if request_profiler.armed else "empty"
+        raise HTTPException(status_code=404, detail=f"no profile ({status})")
+    return Response(
+        content=request_profiler.result,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="requests.prof"'},
+    )
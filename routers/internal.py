@@ -0,0 +1,23 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from services.catalog_service import catalog
+from services.geo_shard import shard_router
+from utils.config import config
+
+
+def require_internal(x_internal_token: str = Header(default="")):
+    """노드 간 호출 확인 (INTERNAL_TOKEN 미설정 시 전부 거부)"""
+    if not config.INTERNAL_TOKEN or not hmac.compare_digest(x_internal_token, config.INTERNAL_TOKEN):
+        raise HTTPException(status_code=403, detail="forbidden")
+
+
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(require_internal)])
+
+
+@router.get("/stores/nearby")
+async def stores_nearby(lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180),
+                        radius_km: float = Query(5.0, gt=0, le=50), top_k: int = Query(5, gt=0, le=100)):
+    """이 노드 담당 지역의 반경 검색 결과 (다른 노드의 shard_router 가 호출)"""
+    if not catalog.loaded:
+        raise HTTPException(status_code=503, detail="catalog not loaded")
+    return {"stores": shard_router.local_nearby(catalog, lat, lng, radius_km, top_k)}
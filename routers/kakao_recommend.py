@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Request
-from typing import Dict, Any
+import time
+from fastapi import APIRouter, Request, Response
 from services.pinecone_service import PineconeService
 from services.kakao_service import KakaoService
+from services.store_warmer import store_warmer
+from services.idempotency import idempotency
+from services.catalog_service import catalog
+from services.geo_shard import shard_router
+from services.event_log import event_log, elapsed_ms
+from services.result_pager import result_pager
+from services.resilience import UpstreamUnavailable
+from models.schemas import KakaoSkillRequest
 from .session import user_sessions
 
 router = APIRouter(prefix="/kakao", tags=["kakao-recommend"])
@@ -11,38 +19,88 @@ kakao = KakaoService()
 # 추천/검색 블록의 스킬 URL => /kakao/recommend 로 설정
 @router.post("/recommend")
 async def kakao_recommend(request: Request):
-    body: Dict[str, Any] = await request.json()
+    body = kakao.parse_skill_request(await request.body())
+    # 재시도/연타로 들어온 같은 요청은 한 번만 처리 (메시지형 "더보기" 는 세션 커서로 구분)
+    cursor = result_pager.dedup_cursor(user_sessions.get(body.user_key), body.utterance, body.client_extra)
+    return await idempotency.run(idempotency.key_for("recommend", body, cursor), lambda: _recommend(body))
 
-    user_key = body.get("userRequest", {}).get("user", {}).get("id", "")
-    utterance = body.get("userRequest", {}).get("utterance", "") or ""
+
+async def _recommend(body: KakaoSkillRequest):
+    started = time.perf_counter()
+    user_key = body.user_key
+    utterance = body.utterance
+
+    # "더보기": 세션에 저장된 순위 목록에서 다음 페이지 (검색 다시 안 함)
+    if result_pager.wants_more(utterance, body.client_extra):
+        return _more(body, started)
 
     # 오픈빌더 params (sys_location, food, location) 
-    params = body.get("action", {}).get("params", {}) or {}
-    sys_location = params.get("sys_location")
-    food = params.get("food")
-    location = params.get("location")
+    sys_location = body.params.sys_location
+    food = body.params.food
+    location = body.params.location
 
     # 위치명 → 좌표
     geo = await kakao.geocode_landmark(location, sys_location)
+    # 더보기용으로 한 번에 깊게 검색
+    depth = result_pager.depth
+
+    try:
+        if geo:
+            lat, lng = geo["lat"], geo["lng"]
+            if catalog.loaded:
+                # 좌표가 속한 지역 샤드(+반경이 걸친 이웃 샤드)에서 검색
+                stores = await shard_router.nearby(catalog, lat, lng, radius_km=5.0, top_k=depth)
+            else:
+                stores = await pinecone.search_stores_by_location(lat, lng, radius_km=5.0, top_k=depth)
+        else:
+            # 텍스트 기반 백업 검색
+            query = " ".join([x for x in [utterance, sys_location, location, food] if x])
+            stores = await pinecone.search_stores_by_text(query, top_k=depth)
+    except UpstreamUnavailable as e:
+        # 검색 불가 ≠ 결과 없음 → 0건 검색으로 기록하지 않고 잠시 후 다시 시도 안내
+        event_log.record("search", user_key, route="recommend", mode="geo" if geo else "text",
+                         utterance=utterance, location=location or sys_location, food=food,
+                         results=None, ok=False, error=str(e), latency_ms=elapsed_ms(started))
+        return kakao.create_text_response("지금은 맛집 검색이 어려워요. 잠시 후 다시 시도해 주세요.")
 
-    if geo:
-        lat, lng = geo["lat"], geo["lng"]
-        stores = await pinecone.search_stores_by_location(lat, lng, radius_km=5.0, top_k=5)
-    else:
-        # 텍스트 기반 백업 검색
-        query = " ".join([x for x in [utterance, sys_location, location, food] if x])
-        stores = await pinecone.search_stores_by_text(query, top_k=5)
+    event_log.record("search", user_key, route="recommend", mode="geo" if geo else "text",
+                     utterance=utterance, location=location or sys_location, food=food,
+                     results=[s.get("id") for s in stores], latency_ms=elapsed_ms(started))
 
     if not stores:
         return kakao.create_text_response("죄송합니다. 검색 결과가 없습니다.")
 
-    # 세션에 결과 저장 (다음 상세보기 라우터에서 활용)
+    # 세션에는 (store_id, 점수) 순위 목록과 커서만 저장 (더보기에서 활용)
+    ranking, page, next_cursor = result_pager.start(stores)
     user_sessions[user_key] = {
         "mode": "list",
-        "stores": stores,
+        **ranking,
         "chat_history": []
     }
 
+    # 상세보기 진입 대비: 카드의 상점들을 백그라운드로 미리 준비
+    store_warmer.schedule(page)
+
     # 추천 리스트: 버튼 blockId는 “가게정보조회(상세보기)” 블록 ID로 지정
-    return kakao.create_list_card_response(stores)
+    return Response(content=kakao.render_list_card(page, next_cursor), media_type="application/json")
+
+
+def _more(body: KakaoSkillRequest, started: float):
+    session = user_sessions.get(body.user_key)
+    if not session or "ranked" not in session:
+        return kakao.create_text_response("먼저 지역이나 메뉴로 맛집 추천을 받아주세요.")
+
+    # 버튼 extra 의 커서 우선 (같은 버튼을 다시 눌러도 같은 페이지)
+    cursor = result_pager.parse_cursor(body.client_extra)
+    page, next_cursor = result_pager.page(session, cursor)
+
+    event_log.record("page", body.user_key, route="recommend", cursor=cursor,
+                     results=[s.get("id") for s in page], latency_ms=elapsed_ms(started))
+
+    if not page:
+        return kakao.create_text_response("더 보여드릴 가게가 없어요. 다른 지역이나 메뉴로 찾아보세요.")
+
+    # 카탈로그/검색 결과로만 준비 (외부 호출 없음)
+    store_warmer.schedule(page)
+    return Response(content=kakao.render_list_card(page, next_cursor), media_type="application/json")
 
@@ -1,8 +1,15 @@
+import time
 from fastapi import APIRouter, Request
 from typing import Dict, Any, List
 from services.pinecone_service import PineconeService
 from services.openai_service import OpenAIService
 from services.kakao_service import KakaoService
+from services.resilience import UpstreamUnavailable
+from services.store_warmer import store_warmer
+from services.idempotency import idempotency
+from services.event_log import event_log, elapsed_ms
+from services.result_pager import result_pager
+from models.schemas import KakaoSkillRequest
 from .session import user_sessions
 
 router = APIRouter(prefix="/kakao", tags=["kakao-store"])
@@ -24,27 +31,51 @@ def _pick_store_by_name(name: str, stores: List[Dict[str, Any]]):
 # 상세보기/가게대화 블록의 스킬 URL => /kakao/store 로 설정
 @router.post("/store")
 async def kakao_store(request: Request):
-    body = await request.json()
-    user_key = body.get("userRequest", {}).get("user", {}).get("id", "")
-    utterance = (body.get("userRequest", {}).get("utterance") or "").strip()
+    body = kakao_service.parse_skill_request(await request.body())
+    # 같은 질문이 두 번 들어와도 LLM 호출/히스토리 추가는 한 번만
+    return await idempotency.run(idempotency.key_for("store", body), lambda: _store(body))
 
-    # 상세보기 버튼에서 넘어온 extra (가게 이름)
-    extra = (body.get("action") or {}).get("clientExtra") or {}
+
+async def _store(body: KakaoSkillRequest):
+    started = time.perf_counter()
+    user_key = body.user_key
+    utterance = body.utterance
+
+    # 상세보기 버튼에서 넘어온 extra (가게 ID, 가게 이름)
+    extra = body.client_extra
+    store_id = extra.get("store_id")
     store_name = (extra.get("store_name") or "").strip()
 
     # 1) 진입 첫 호출: utterance가 비어있음 → 인사만 보내고 세션 설정
     if not utterance:
-        if store_name:
+        # 추천 단계에서 미리 준비해 둔 상점이면 메모리에서 바로 사용
+        store_info = await store_warmer.get(store_id)
+        source = "warm" if store_info is not None else "search"
+        if store_info is None and store_name:
             # pinecone에서 1건만 찾아 캐시(다음 턴에 LLM이 사용할 수 있도록)
-            stores = await pinecone_service.search_stores_by_text(store_name, top_k=1)
+            try:
+                stores = await pinecone_service.search_stores_by_text(store_name, top_k=1)
+            except UpstreamUnavailable as e:
+                # 가게 정보 없이 세션을 만들면 이후 답변이 엉뚱해지므로 안내만
+                event_log.record("select", user_key, store_id=store_id, store_name=store_name,
+                                 source="none", ok=False, error=str(e), latency_ms=elapsed_ms(started))
+                return kakao_service.create_text_response("지금은 가게 정보를 불러오기 어려워요. 잠시 후 다시 눌러 주세요.")
             store_info = stores[0] if stores else {"name": store_name}
 
+        if store_info is not None:
+            store_name = store_name or store_info.get("name", "")
+            # 순위 목록은 남겨 둠 (상세보기 후에도 목록의 "더보기" 가 이어지도록)
             user_sessions[user_key] = {
                 "mode": "detail",
                 "store": store_info,
-                "chat_history": []
+                "chat_history": [],
+                **result_pager.carry(user_sessions.get(user_key)),
             }
 
+        event_log.record("select", user_key, store_id=store_id or (store_info or {}).get("id"),
+                         store_name=store_name, source=source if store_info is not None else "none",
+                         latency_ms=elapsed_ms(started))
+
         # (가게가 안 잡혀도 인사는 보냅니다)
         text = f"안녕하세요! 😊 '{store_name}'입니다.\n무엇을 도와드릴까요?"
         return kakao_service.create_text_response(text)
@@ -59,7 +90,13 @@ async def kakao_store(request: Request):
     chat_history = session.get("chat_history", [])
 
     # LLM 호출 (느리면 최대한 짧게, 또는 룰 기반으로 처리 후 LLM)
-    reply = await openai_service.generate_store_response(store, utterance, chat_history)
+    try:
+        reply = await openai_service.generate_store_response(store, utterance, chat_history)
+    except UpstreamUnavailable as e:
+        # 답변 생성 불가 → 히스토리에 남기지 않고 안내만
+        event_log.record("qa", user_key, route="store", store_id=store.get("id"), question=utterance,
+                         answer=None, ok=False, error=str(e), latency_ms=elapsed_ms(started))
+        return kakao_service.create_text_response("지금은 답변을 드리기 어려워요. 잠시 후 다시 질문해 주세요.")
 
     chat_history.extend([
         {"role": "user", "content": utterance},
@@ -67,5 +104,7 @@ async def kakao_store(request: Request):
     ])
     session["chat_history"] = chat_history[-10:]
     user_sessions[user_key] = session
+    event_log.record("qa", user_key, route="store", store_id=store.get("id"), question=utterance,
+                     answer=reply, ok=True, latency_ms=elapsed_ms(started))
 
     return kakao_service.create_text_response(reply)
\ No newline at end of file
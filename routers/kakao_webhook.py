@@ -1,8 +1,21 @@
-from fastapi import APIRouter, HTTPException, Request
+import time
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any
 from services.pinecone_service import PineconeService
 from services.openai_service import OpenAIService
 from services.kakao_service import KakaoService
+from services.store_warmer import store_warmer
+from services.idempotency import idempotency
+from services.catalog_service import catalog
+from services.geo_shard import shard_router
+from services.event_log import event_log, elapsed_ms
+from services.warmup import warmup
+from services.result_pager import result_pager
+from models.schemas import KakaoSkillRequest
+from services.resilience import UpstreamUnavailable, upstreams
+from services.model_router import model_router
+from services.openai_scheduler import openai_scheduler
 
 router = APIRouter(prefix="/kakao", tags=["kakao"])
 pinecone_service = PineconeService()
@@ -16,20 +29,39 @@ user_sessions = {}
 async def kakao_webhook(request: Request):
     """카카오톡 챗봇 웹훅"""
     try:
-        body = await request.json()
-        
+        body = kakao_service.parse_skill_request(await request.body())
+    except Exception as e:
+        print(f"Error in webhook: {e}")
+        return kakao_service.create_text_response("죄송합니다. 오류가 발생했습니다.")
+    cursor = result_pager.dedup_cursor(user_sessions.get(body.user_key), body.utterance, body.client_extra)
+    return await idempotency.run(idempotency.key_for("webhook", body, cursor), lambda: _webhook(body))
+
+
+async def _webhook(body: KakaoSkillRequest):
+    started = time.perf_counter()
+    try:
         # 카카오톡 요청 파싱
-        user_key = body.get("userRequest", {}).get("user", {}).get("id", "")
-        utterance = body.get("userRequest", {}).get("utterance", "")
+        user_key = body.user_key
+        utterance = body.utterance
         
         # 카카오에서 넘어오는 파라미터 저장
-        params = body.get("action", {}).get("params", {}) or {}
-        sys_location = params.get("sys_location")  
-        food        = params.get("food")          
-        location    = params.get("location")       
+        params = body.params
+        sys_location = params.sys_location  
+        food        = params.food          
+        location    = params.location       
     
                 
 
+        # "더보기": 직전 검색의 다음 페이지 (검색 다시 안 함)
+        if result_pager.wants_more(utterance, body.client_extra) and "ranked" in user_sessions.get(user_key, {}):
+            page, next_cursor = result_pager.page(user_sessions[user_key], result_pager.parse_cursor(body.client_extra))
+            event_log.record("page", user_key, route="webhook", results=[s.get("id") for s in page],
+                             latency_ms=elapsed_ms(started))
+            if not page:
+                return kakao_service.create_text_response("더 보여드릴 가게가 없어요. 다른 지역이나 메뉴로 찾아보세요.")
+            store_warmer.schedule(page)
+            return Response(content=kakao_service.render_list_card(page, next_cursor), media_type="application/json")
+
         is_search = ("추천" in utterance) or ("맛집" in utterance) or any([sys_location, food, location])
 
         if is_search:
@@ -40,26 +72,36 @@ async def kakao_webhook(request: Request):
 
             if geo:
                 lat, lng = geo["lat"], geo["lng"]
-                stores = await pinecone_service.search_stores_by_location(lat, lng, radius=5.0, top_k=5)
+                if catalog.loaded:
+                    stores = await shard_router.nearby(catalog, lat, lng, radius_km=5.0, top_k=result_pager.depth)
+                else:
+                    stores = await pinecone_service.search_stores_by_location(lat, lng, radius_km=5.0,
+                                                                             top_k=result_pager.depth)
             else:   
             # 텍스트 기반 검색: 발화 + 파라미터를 하나의 쿼리로 묶어 강화
                 terms = [utterance, sys_location, location, food]
                 query = " ".join([t for t in terms if t])  # 빈 값은 제외
-                stores = await pinecone_service.search_stores_by_text(query, top_k=5)
+                stores = await pinecone_service.search_stores_by_text(query, top_k=result_pager.depth)
+
+            event_log.record("search", user_key, route="webhook", mode="geo" if geo else "text",
+                             utterance=utterance, location=location or sys_location, food=food,
+                             results=[s.get("id") for s in stores], latency_ms=elapsed_ms(started))
 
             if stores:
                 # 세션에 검색 결과 저장 → 다음 턴에서 가게 선택 처리
-                user_sessions[user_key] = {"mode": "list", "stores": stores}
-                return kakao_service.create_list_card_response(stores)
+                ranking, page, next_cursor = result_pager.start(stores)
+                user_sessions[user_key] = {"mode": "list", **ranking}
+                store_warmer.schedule(page)
+                return Response(content=kakao_service.render_list_card(page, next_cursor),
+                                media_type="application/json")
 
             return kakao_service.create_text_response("죄송합니다. 검색 결과가 없습니다.")
 
-        action = body.get("action", {})
-        client_extra = action.get("clientExtra") or action.get("client_extra") or {}
+        client_extra = body.client_extra
         store_name = (
-            params.get("store_name")
+            params.store_name
             or client_extra.get("store_name")
-            or utterance.strip()
+            or utterance
         )
 
         if store_name:
@@ -67,7 +109,12 @@ async def kakao_webhook(request: Request):
             stores = await pinecone_service.search_stores_by_text(store_name, top_k=1)
             if stores:
                 store_info = stores[0]
-                user_sessions[user_key] = {"mode": "detail", "store": store_info, "chat_history": []}
+                # 순위 목록은 남겨 둠 (상세보기 후에도 목록의 "더보기" 가 이어지도록)
+                user_sessions[user_key] = {"mode": "detail", "store": store_info, "chat_history": [],
+                                           **result_pager.carry(user_sessions.get(user_key))}
+                event_log.record("select", user_key, store_id=store_info.get("id"),
+                                 store_name=store_info.get("name"), source="search",
+                                 latency_ms=elapsed_ms(started))
 
                 # LLM 호출하지 않고, 인사만 즉시 반환 (타임아웃 방지)
                 intro_text = f"안녕하세요! 😊 '{store_info['name']}'입니다.\n무엇을 도와드릴까요?"
@@ -89,6 +136,8 @@ async def kakao_webhook(request: Request):
                 {"role": "assistant", "content": response},
             ])
             user_sessions[user_key]["chat_history"] = chat_history[-10:]
+            event_log.record("qa", user_key, route="webhook", store_id=store_info.get("id"),
+                             question=utterance, answer=response, ok=True, latency_ms=elapsed_ms(started))
 
             return kakao_service.create_text_response(response)
 
@@ -97,11 +146,34 @@ async def kakao_webhook(request: Request):
             "안녕하세요! 맛집을 찾아드립니다.\n'근처 맛집 추천해줘' 또는 '한식 맛집 찾아줘'라고 말씀해주세요."
         )
 
+    except UpstreamUnavailable as e:
+        print(f"Upstream unavailable in webhook: {e}")
+        return kakao_service.create_text_response("지금은 답변을 드리기 어려워요. 잠시 후 다시 시도해 주세요.")
+
     except Exception as e:
         print(f"Error in webhook: {e}")
         return kakao_service.create_text_response("죄송합니다. 오류가 발생했습니다.")
 
 @router.get("/health")
 async def health_check():
-    """헬스 체크"""
-    return {"status": "ok"}
+    """헬스 체크 (프로세스 생존 + 외부 의존성 상태). 트래픽 투입 여부는 /kakao/ready"""
+    return {
+        "status": "ok",
+        "ready": warmup.ready,
+        "upstreams": {name: u.stats() for name, u in upstreams.items()},
+        "model_router": model_router.snapshot(),
+        "openai_scheduler": openai_scheduler.stats(),
+        "store_warmer": store_warmer.stats(),
+        "idempotency": idempotency.stats(),
+        "event_log": event_log.stats(),
+        "result_pager": result_pager.stats(),
+        "shards": {**shard_router.stats(), "catalog_stores": len(catalog)},
+    }
+
+
+@router.get("/ready")
+async def readiness_check():
+    """준비 상태: 워밍업(필수 단계)이 끝나기 전에는 503 → 로드밸런서가 트래픽을 보내지 않음"""
+    stats = warmup.stats()
+    return ORJSONResponse({"status": "ready" if stats["ready"] else "starting", **stats},
+                          status_code=200 if stats["ready"] else 503)
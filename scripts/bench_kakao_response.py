@@ -0,0 +1,103 @@
+"""
+카카오 스킬 요청/응답 직렬화 벤치마크
+
+기존 경로(request.json() + dict .get() 체인 / 카드 dict 재생성 + json.dumps)와
+새 경로(model_validate_json / 캐시된 카드 조각 + orjson)의 요청당 CPU 시간을 비교한다.
+
+파싱은 타입 검증을 거치면서도 기존과 비슷하거나 약간 빠른 수준이고, 절감은 주로 렌더링에서 나온다.
+(스킬 요청 모델에 파이썬 검증기를 넣으면 파싱이 기존보다 느려지므로 이 벤치로 확인할 것)
+
+    python -m scripts.bench_kakao_response
+"""
+import json
+import time
+
+from services.kakao_service import KakaoService
+
+N = 20000
+
+STORES = [
+    {
+        "id": f"store-{i}",
+        "surveyId": f"store-{i}",
+        "name": f"맛있는 식당 {i}",
+        "industry": "한식",
+        "address": f"서울특별시 마포구 양화로 {i}길 12",
+        "services": [
+            {"menu": "김치찌개", "price": "9,000"},
+            {"menu": "된장찌개", "price": "9,000"},
+            {"menu": "제육볶음", "price": "11,000"},
+            {"menu": "계란말이", "price": "7,000"},
+        ],
+    }
+    for i in range(5)
+]
+
+BODY = json.dumps({
+    "intent": {"id": "intent-id", "name": "맛집추천"},
+    "userRequest": {
+        "timezone": "Asia/Seoul",
+        "params": {"ignoreMe": "true"},
+        "block": {"id": "block-id", "name": "맛집추천"},
+        "utterance": "홍대 근처 한식 맛집 추천해줘",
+        "lang": "ko",
+        "user": {"id": "user-1234", "type": "accountId", "properties": {}},
+    },
+    "bot": {"id": "bot-id", "name": "맛집봇"},
+    "action": {
+        "name": "recommend",
+        "clientExtra": None,
+        "params": {"location": "홍대입구역", "food": "한식"},
+        "id": "action-id",
+        "detailParams": {},
+    },
+}, ensure_ascii=False).encode()
+
+
+def _old_parse(raw: bytes):
+    body = json.loads(raw)
+    user_key = body.get("userRequest", {}).get("user", {}).get("id", "")
+    utterance = body.get("userRequest", {}).get("utterance", "") or ""
+    params = body.get("action", {}).get("params", {}) or {}
+    return user_key, utterance, params.get("sys_location"), params.get("food"), params.get("location")
+
+
+def _new_parse(raw: bytes):
+    body = KakaoService.parse_skill_request(raw)
+    p = body.params
+    return body.user_key, body.utterance, p.sys_location, p.food, p.location
+
+
+def _old_render():
+    return json.dumps(KakaoService.create_list_card_response(STORES), ensure_ascii=False).encode()
+
+
+def _new_render():
+    return KakaoService.render_list_card(STORES)
+
+
+def _bench(fn, repeat: int = 5) -> float:
+    fn()  # 캐시 워밍
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        for _ in range(N):
+            fn()
+        best = min(best, time.process_time() - start)
+    return best / N * 1e6  # us / request (반복 중 최솟값)
+
+
+def main():
+    assert json.loads(_old_render()) == json.loads(_new_render())
+    cases = [
+        ("parse", lambda: _old_parse(BODY), lambda: _new_parse(BODY)),
+        ("render", _old_render, _new_render),
+    ]
+    for label, old, new in cases:
+        t_old = _bench(old)
+        t_new = _bench(new)
+        print(f"{label:<7} old {t_old:7.2f}us  new {t_new:7.2f}us  saved {t_old - t_new:7.2f}us/req")
+
+
+if __name__ == "__main__":
+    main()
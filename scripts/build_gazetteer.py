@@ -0,0 +1,50 @@
+"""
+지명 사전 CSV 정리 도구
+
+공공데이터 등에서 받은 원본 CSV 를 data/landmarks.csv 형식(name,aliases,lat,lng)으로 변환한다.
+이름이 같은 행은 별칭을 합치고, 좌표가 없는 행은 버린다.
+
+    python -m scripts.build_gazetteer raw.csv data/landmarks.csv \
+        --name-col 역사명 --lat-col 위도 --lng-col 경도 [--alias-col 별칭]
+"""
+import argparse
+import csv
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--name-col", default="name")
+    parser.add_argument("--lat-col", default="lat")
+    parser.add_argument("--lng-col", default="lng")
+    parser.add_argument("--alias-col", default="aliases")
+    args = parser.parse_args()
+
+    places = {}
+    with open(args.src, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            name = (row.get(args.name_col) or "").strip()
+            try:
+                lat, lng = float(row[args.lat_col]), float(row[args.lng_col])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not name:
+                continue
+            aliases = {a.strip() for a in (row.get(args.alias_col) or "").split("|") if a.strip()}
+            if name in places:
+                places[name][2].update(aliases)
+            else:
+                places[name] = (lat, lng, aliases)
+
+    with open(args.dst, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "aliases", "lat", "lng"])
+        for name in sorted(places):
+            lat, lng, aliases = places[name]
+            w.writerow([name, "|".join(sorted(aliases - {name})), f"{lat:.6f}", f"{lng:.6f}"])
+    print(f"{len(places)} landmarks -> {args.dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+`import main` 시간 예산 검사 (CI/배포 전 실행, 초과 시 exit 1)
+
+    python -m scripts.check_import_time --budget-ms 800
+    python -m scripts.check_import_time --top 15      # 오래 걸린 모듈 목록
+
+- 새 인터프리터에서 -X importtime 으로 측정 (캐시된 모듈 영향 없음)
+- openai / pinecone SDK 는 import 단계에서 로드되면 안 됨 (워밍업 때 로드)
+- import 중에는 네트워크 호출이 없어야 하므로 소켓 연결 시도도 실패로 처리
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+LAZY_MODULES = ("openai", "pinecone")
+
+_PROBE = """
+import socket, sys, time
+def _deny(*a, **k):
+    raise RuntimeError("network call during import")
+socket.socket.connect = _deny
+socket.create_connection = _deny
+started = time.perf_counter()
+import main
+elapsed = (time.perf_counter() - started) * 1000
+loaded = [m for m in {lazy!r} if m in sys.modules]
+print(f"RESULT {{elapsed:.1f}} {{','.join(loaded)}}")
+"""
+
+
+def parse_importtime(stderr: str):
+    """-X importtime 출력 → (누적 us, 모듈) 목록"""
+    # 형식: "import time:   self_us |  cumulative_us | [들여쓰기]module"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(lazy=LAZY_MODULES)],
+        cwd=root, capture_output=True, text=True,
+    )
+    result = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+    if proc.returncode != 0 or not result:
+        print(proc.stderr[-3000:])
+        print("FAIL: import main raised")
+        sys.exit(1)
+
+    _, elapsed, loaded = (result[0].split(" ") + [""])[:3]
+    elapsed = float(elapsed)
+
+    top = sorted(parse_importtime(proc.stderr), reverse=True)[:args.top]
+    print(f"import main: {elapsed:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    for cumulative_us, name in top:
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+    failures = []
+    if elapsed > args.budget_ms:
+        failures.append(f"import took {elapsed:.0f}ms > {args.budget_ms:.0f}ms")
+    if loaded:
+        failures.append(f"heavy SDKs imported eagerly: {loaded}")
+    for f in failures:
+        print(f"FAIL: {f}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+재생 부하 테스트용 가짜 업스트림 (OpenAI / Pinecone 데이터 플레인 / 카카오 로컬)
+
+실제 API 대신 고정 지연(+지터)으로 응답해 서버 자체의 성능 변화만 비교할 수 있게 한다.
+상점은 지명 사전(data/landmarks.csv) 주변에 고정 시드로 생성하고, 쿼리 결과도 쿼리 벡터/top_k 로
+시드를 정해 같은 캡처를 재생하면 빌드가 달라도 같은 상점이 나온다.
+
+    python -m scripts.fake_upstreams --port 9100 --stores 2000 --openai-ms 400 --pinecone-ms 40
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import ORJSONResponse
+
+from services.gazetteer import gazetteer
+
+DIM = 1536
+INDUSTRIES = ["한식", "중식", "일식", "양식", "카페", "분식", "주점"]
+MENUS = ["김치찌개", "된장찌개", "짜장면", "초밥", "파스타", "아메리카노", "떡볶이", "치킨", "삼겹살"]
+
+app = FastAPI(default_response_class=ORJSONResponse)
+settings = {"openai_ms": 400.0, "pinecone_ms": 40.0, "kakao_ms": 30.0, "jitter": 0.3}
+stores: dict = {}
+
+
+async def _delay(key: str):
+    base = settings[key] / 1000
+    await asyncio.sleep(max(0.0, random.gauss(base, base * settings["jitter"])))
+
+
+def _build_stores(count: int, seed: int = 42):
+    rnd = random.Random(seed)
+    places = gazetteer.places() or [("서울역", 37.5547, 126.9707)]
+    for i in range(count):
+        name, lat, lng = places[i % len(places)]
+        sid = f"fake-{i:06d}"
+        stores[sid] = {
+            "surveyId": sid,
+            "name": f"{name} {rnd.choice(INDUSTRIES)} {i}",
+            "industry": rnd.choice(INDUSTRIES),
+            "address": f"{name} 인근 {i}번지",
+            "phone": f"02-000-{i % 10000:04d}",
+            "openingHourStart": "11:00",
+            "openingHourEnd": "22:00",
+            "holidays": "",
+            "services": str([{"menu": m, "price": str(rnd.randrange(5, 30) * 1000)}
+                             for m in rnd.sample(MENUS, 3)]),
+            "latitude": lat + rnd.uniform(-0.02, 0.02),
+            "longitude": lng + rnd.uniform(-0.02, 0.02),
+        }
+
+
+def _rate_headers():
+    return {"x-ratelimit-remaining-requests": "10000", "x-ratelimit-reset-requests": "1s",
+            "x-ratelimit-remaining-tokens": "10000000", "x-ratelimit-reset-tokens": "1s"}
+
+
+def _fake_vector(text: str) -> List[float]:
+    seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+    rnd = random.Random(seed)
+    return [rnd.uniform(-1, 1) for _ in range(8)] + [0.0] * (DIM - 8)
+
+
+def _query_rng(vector, top_k: int) -> random.Random:
+    """같은 쿼리(벡터 + top_k)는 실행마다 같은 결과가 나오도록 쿼리로 시드한 RNG"""
+    digest = hashlib.md5(repr((vector, top_k)).encode()).hexdigest()[:16]
+    return random.Random(int(digest, 16))
+
+
+# ---------------- OpenAI ----------------
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    await _delay("openai_ms")
+    return ORJSONResponse({
+        "object": "list",
+        "data": [{"object": "embedding", "index": i, "embedding": _fake_vector(t)} for i, t in enumerate(inputs)],
+        "model": body.get("model", "fake"),
+        "usage": {"prompt_tokens": sum(len(t) for t in inputs), "total_tokens": sum(len(t) for t in inputs)},
+    }, headers=_rate_headers())
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await _delay("openai_ms")
+    question = body["messages"][-1]["content"]
+    return ORJSONResponse({
+        "id": f"chatcmpl-{int(time.time() * 1000)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": f"(가짜 답변) {question[:50]}"}}],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+    }, headers=_rate_headers())
+
+
+@app.get("/v1/models/{model_id}")
+async def retrieve_model(model_id: str):
+    # 워밍업의 models.retrieve 용
+    return {"id": model_id, "object": "model", "created": 0, "owned_by": "fake"}
+
+
+# ---------------- Pinecone 데이터 플레인 ----------------
+
+@app.post("/query")
+async def query(request: Request):
+    body = await request.json()
+    await _delay("pinecone_ms")
+    top_k = body.get("topK", 10)
+    rnd = _query_rng(body.get("vector") or body.get("id") or "", top_k)
+    ids = rnd.sample(sorted(stores), min(top_k, len(stores)))
+    return {
+        "matches": [{"id": sid, "score": round(rnd.random(), 4),
+                     "metadata": stores[sid] if body.get("includeMetadata") else None} for sid in ids],
+        "namespace": body.get("namespace", ""),
+        "usage": {"readUnits": 5},
+    }
+
+
+@app.get("/vectors/fetch")
+async def fetch(ids: List[str] = Query(default=[]), namespace: str = ""):
+    await _delay("pinecone_ms")
+    return {
+        # SDK 가 values 가 빈 벡터를 거부하므로 실제 길이의 벡터로 응답
+        "vectors": {sid: {"id": sid, "values": _fake_vector(sid), "metadata": stores[sid]}
+                    for sid in ids if sid in stores},
+        "namespace": namespace,
+        "usage": {"readUnits": 1},
+    }
+
+
+@app.get("/vectors/list")
+async def list_vectors(limit: int = 100, paginationToken: Optional[str] = None, namespace: str = ""):
+    ids = sorted(stores)
+    start = int(paginationToken or 0)
+    page = ids[start:start + limit]
+    nxt = start + limit
+    return {
+        "vectors": [{"id": sid} for sid in page],
+        "pagination": {"next": str(nxt)} if nxt < len(ids) else None,
+        "namespace": namespace,
+        "usage": {"readUnits": 1},
+    }
+
+
+@app.post("/vectors/update")
+async def update(request: Request):
+    body = await request.json()
+    if body.get("id") in stores:
+        stores[body["id"]].update(body.get("setMetadata") or {})
+    return {}
+
+
+@app.post("/describe_index_stats")
+async def describe_index_stats():
+    return {"namespaces": {"": {"vectorCount": len(stores)}}, "dimension": DIM,
+            "indexFullness": 0.0, "totalVectorCount": len(stores)}
+
+
+# ---------------- 카카오 로컬 ----------------
+
+@app.get("/v2/local/search/keyword.json")
+@app.get("/v2/local/search/address.json")
+async def kakao_local(query: str = ""):
+    await _delay("kakao_ms")
+    hit = gazetteer.lookup(query)
+    docs = [{"place_name": hit["name"], "address_name": hit["name"],
+             "y": str(hit["lat"]), "x": str(hit["lng"])}] if hit else []
+    return {"documents": docs, "meta": {"total_count": len(docs)}}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--stores", type=int, default=2000)
+    parser.add_argument("--openai-ms", type=float, default=400.0)
+    parser.add_argument("--pinecone-ms", type=float, default=40.0)
+    parser.add_argument("--kakao-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    settings.update(openai_ms=args.openai_ms, pinecone_ms=args.pinecone_ms, kakao_ms=args.kakao_ms)
+    _build_stores(args.stores)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+좌표 없는 상점 주소 일괄 지오코딩 → Pinecone 메타데이터에 latitude/longitude 기록
+
+    python -m scripts.geocode_stores --checkpoint geocode.jsonl [--concurrency 10] [--rate 20]
+    python -m scripts.geocode_stores --fake-csv fake.csv --dry-run   # 네트워크 없이 확인
+    python -m scripts.geocode_stores --smoke                          # StaticGeocoder 로 전체 흐름 점검 (실패 시 exit 1)
+
+--fake-csv 는 address,lat,lng 형식. 중단 후 같은 --checkpoint 로 다시 실행하면 이어서 진행한다.
+"""
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from services.batch_geocoder import BatchGeocoder, KakaoAddressGeocoder, StaticGeocoder
+from services.pinecone_service import PineconeService
+from utils.config import config
+
+
+def _load_fake(path: str) -> StaticGeocoder:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        table = {row["address"]: (float(row["lat"]), float(row["lng"])) for row in csv.DictReader(f)}
+    return StaticGeocoder(table)
+
+
+async def _smoke(concurrency: int) -> bool:
+    """가짜 상점/좌표로 지오코딩 → 기록 → 체크포인트 재개까지 확인 (Pinecone/카카오 호출 없음)"""
+    stores = [{"id": f"smoke-{i}", "address": f"서울 마포구 양화로 {i % 50} (1층)"} for i in range(200)]
+    stores.append({"id": "smoke-geo", "address": "서울 중구 세종대로 110", "latitude": 37.56, "longitude": 126.97})
+    table = {f"서울 마포구 양화로 {i}": (37.5 + i / 1000, 126.9 + i / 1000) for i in range(50)}
+    written = {}
+
+    async def update(store_id, coord):
+        await asyncio.sleep(0.001)
+        written[store_id] = coord
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "checkpoint.jsonl")
+        first = BatchGeocoder(StaticGeocoder(table), concurrency=concurrency,
+                              rate_per_sec=0, checkpoint_path=checkpoint)
+        await first.run(stores, update=update)
+        resumed_geocoder = StaticGeocoder(table)
+        second = BatchGeocoder(resumed_geocoder, concurrency=concurrency,
+                               rate_per_sec=0, checkpoint_path=checkpoint)
+        await second.run(stores)
+
+    checks = {
+        "lookups once per address": first.stats["lookups"] == 50,
+        "all missing stores updated": first.stats["updated"] == 200 and len(written) == 200,
+        "stores with coordinates skipped": "smoke-geo" not in written,
+        "resume skips lookups": resumed_geocoder.calls == 0 and second.stats["resumed"] == 50,
+    }
+    print(f"[GEOCODE] smoke {first.stats}")
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    return all(checks.values())
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkpoint", default="geocode_checkpoint.jsonl")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=20.0, help="초당 최대 요청 수")
+    parser.add_argument("--fake-csv", help="카카오 API 대신 사용할 주소-좌표 CSV")
+    parser.add_argument("--dry-run", action="store_true", help="Pinecone 에 쓰지 않음")
+    parser.add_argument("--smoke", action="store_true", help="가짜 데이터로 전체 흐름만 점검")
+    args = parser.parse_args()
+
+    if args.smoke:
+        sys.exit(0 if await _smoke(args.concurrency) else 1)
+
+    if args.fake_csv:
+        geocoder = _load_fake(args.fake_csv)
+    else:
+        geocoder = KakaoAddressGeocoder(os.getenv("KAKAO_REST_API_KEY", ""), concurrency=args.concurrency,
+                                        base_url=config.KAKAO_LOCAL_BASE_URL)
+
+    pinecone = PineconeService()
+    stores = list(pinecone.iter_all_stores())
+    update = None if args.dry_run else (
+        lambda store_id, coord: pinecone.update_store_location(store_id, coord[0], coord[1])
+    )
+
+    batch = BatchGeocoder(geocoder, concurrency=args.concurrency,
+                          rate_per_sec=args.rate, checkpoint_path=args.checkpoint)
+    started = time.perf_counter()
+    try:
+        await batch.run(stores, update=update)
+    finally:
+        await geocoder.aclose()
+    print(f"[GEOCODE] {batch.stats} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
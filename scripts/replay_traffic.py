@@ -0,0 +1,142 @@
+"""
+수집한 운영 트래픽(captures/*.jsonl.gz) 재생 → 지연 분포 비교
+
+    # 로컬 인스턴스를 가짜 업스트림에 붙여 실행
+    python -m scripts.fake_upstreams --port 9100 &
+    OPENAI_BASE_URL=http://localhost:9100/v1 KAKAO_LOCAL_BASE_URL=http://localhost:9100 \
+    PINECONE_INDEX_URL=http://localhost:9100 KAKAO_REST_API_KEY=fake python main.py
+
+    # 원래 간격 그대로(1x) 또는 --speed 4 처럼 빠르게 재생
+    python -m scripts.replay_traffic captures/ --target http://localhost:8000 --speed 4 --save new.json
+    python -m scripts.replay_traffic captures/ --target http://localhost:8000 --compare base.json
+
+요청 간격은 수집된 ts 기준으로 재현한다 (open-loop: 응답이 늦어도 다음 요청은 제시간에 보냄).
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+import orjson
+
+from services.log_writer import read_jsonl_gz
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def load_records(paths: List[str], limit: int = 0) -> List[dict]:
+    files = []
+    for p in paths:
+        files.extend(sorted(glob.glob(os.path.join(p, "*.jsonl.gz"))) if os.path.isdir(p) else [p])
+    records = [r for f in files for r in read_jsonl_gz(f)]
+    records.sort(key=lambda r: r["ts"])
+    return records[:limit] if limit else records
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int]) -> Dict[str, dict]:
+    summary = {}
+    for path in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(path, []))
+        summary[path] = {
+            "count": len(values),
+            "errors": errors.get(path, 0),
+            **{f"p{q}": round(percentile(values, q), 1) for q in PERCENTILES},
+            "max": round(values[-1], 1) if values else 0.0,
+        }
+    return summary
+
+
+async def replay(records: List[dict], target: str, speed: float, max_inflight: int):
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    sem = asyncio.Semaphore(max_inflight)
+    t0 = records[0]["ts"]
+    started = time.monotonic()
+
+    async with httpx.AsyncClient(base_url=target, timeout=30.0,
+                                 limits=httpx.Limits(max_connections=max_inflight)) as client:
+        async def send(rec):
+            async with sem:
+                begin = time.perf_counter()
+                try:
+                    r = await client.post(rec["path"], content=orjson.dumps(rec["body"]),
+                                          headers={"Content-Type": "application/json"})
+                    ok = r.status_code < 500
+                except httpx.HTTPError:
+                    ok = False
+                elapsed_ms = (time.perf_counter() - begin) * 1000
+                if ok:
+                    latencies[rec["path"]].append(elapsed_ms)
+                else:
+                    errors[rec["path"]] += 1
+
+        tasks = []
+        for rec in records:
+            delay = (rec["ts"] - t0) / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(send(rec)))
+        await asyncio.gather(*tasks)
+
+    return summarize(latencies, errors), time.monotonic() - started
+
+
+def print_summary(summary: Dict[str, dict], baseline: Dict[str, dict] = None):
+    cols = [f"p{q}" for q in PERCENTILES] + ["max"]
+    print(f"{'path':<20}{'count':>7}{'err':>6}" + "".join(f"{c:>16}" for c in cols))
+    for path, s in summary.items():
+        row = f"{path:<20}{s['count']:>7}{s['errors']:>6}"
+        for c in cols:
+            if baseline and path in baseline:
+                b = baseline[path][c]
+                diff = (s[c] - b) / b * 100 if b else 0.0
+                row += f"{s[c]:>9.1f}({diff:+5.0f}%)"
+            else:
+                row += f"{s[c]:>16.1f}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+", help="capture 파일 또는 디렉터리")
+    parser.add_argument("--target", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속 (2 = 두 배 빠르게)")
+    parser.add_argument("--max-inflight", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--save", help="결과 요약 저장 (다른 빌드와 비교용)")
+    parser.add_argument("--compare", help="비교할 이전 결과 (--save 로 저장한 파일)")
+    args = parser.parse_args()
+
+    records = load_records(args.paths, args.limit)
+    if not records:
+        print("no records")
+        return
+    print(f"replaying {len(records)} requests at {args.speed}x → {args.target}")
+    summary, wall = asyncio.run(replay(records, args.target, args.speed, args.max_inflight))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["summary"]
+    print_summary(summary, baseline)
+    print(f"wall time {wall:.1f}s")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"target": args.target, "speed": args.speed, "requests": len(records),
+                       "summary": summary}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# batch_geocoder.py
+#
+# 적재 단계에서 좌표(latitude/longitude)가 없는 상점 주소를 한꺼번에 좌표로 변환.
+#  - 동시 요청 수 제한 + 초당 요청 수 제한 (429 시 대기 후 재시도)
+#  - 정규화한 주소 단위로 캐시 (같은 건물 상점은 1번만 조회)
+#  - 체크포인트(JSONL)에 결과를 바로 기록 → 재실행 시 이어서 진행
+#
+#   python -m scripts.geocode_stores --checkpoint geocode.jsonl
+
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+Coord = Tuple[float, float]
+
+_PAREN_RE = re.compile(r"\([^)]*\)")
+_UNIT_RE = re.compile(r"(지하\s*)?\d+\s*(층|호)\b.*$")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_address(address: str) -> str:
+    """괄호 안 부가정보, 층/호수 이하를 지우고 공백 정리 (좌표는 건물 단위면 충분)"""
+    addr = _PAREN_RE.sub(" ", address or "")
+    addr = addr.replace(",", " ")
+    addr = _UNIT_RE.sub("", addr)
+    return _SPACE_RE.sub(" ", addr).strip()
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float = 1.0):
+        super().__init__(f"rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class KakaoAddressGeocoder:
+    """카카오 로컬 주소 검색 (커넥션 풀 공유)"""
+
+    def __init__(self, api_key: str, concurrency: int = 10, timeout: float = 5.0,
+                 base_url: str = "https://dapi.kakao.com"):
+        self.headers = {"Authorization": f"KakaoAK {api_key}"}
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def _first_doc(self, path: str, query: str) -> Optional[Dict[str, Any]]:
+        r = await self.client.get(path, params={"query": query, "size": 1}, headers=self.headers)
+        if r.status_code == 429:
+            raise RateLimited(float(r.headers.get("retry-after") or 1.0))
+        r.raise_for_status()
+        docs = r.json().get("documents", [])
+        return docs[0] if docs else None
+
+    async def geocode(self, address: str) -> Optional[Coord]:
+        doc = await self._first_doc("/v2/local/search/address.json", address)
+        if doc is None:
+            # 도로명/지번으로 안 잡히면 키워드 검색으로 한 번 더
+            doc = await self._first_doc("/v2/local/search/keyword.json", address)
+        if doc is None:
+            return None
+        return float(doc["y"]), float(doc["x"])
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class StaticGeocoder:
+    """네트워크 없이 쓰는 가짜 지오코더 (정규화 주소 -> 좌표). 로컬 테스트용"""
+
+    def __init__(self, table: Dict[str, Coord], delay: float = 0.0):
+        self.table = {normalize_address(k): v for k, v in table.items()}
+        self.delay = delay
+        self.calls = 0
+
+    async def geocode(self, address: str) -> Optional[Coord]:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.table.get(normalize_address(address))
+
+    async def aclose(self):
+        pass
+
+
+class _RateLimiter:
+    """초당 요청 수 제한 (요청 간 최소 간격)"""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        self._next = max(self._next, time.monotonic() + seconds)
+
+
+class BatchGeocoder:
+    def __init__(self, geocoder, concurrency: int = 10, rate_per_sec: float = 20.0,
+                 checkpoint_path: Optional[str] = None, max_retries: int = 3):
+        self.geocoder = geocoder
+        self.concurrency = concurrency
+        self.limiter = _RateLimiter(rate_per_sec)
+        self.checkpoint_path = checkpoint_path
+        self.max_retries = max_retries
+        self.cache: Dict[str, Optional[Coord]] = {}  # 정규화 주소 -> 좌표 (None=검색 결과 없음)
+        self.stats = {"stores": 0, "missing": 0, "lookups": 0, "resumed": 0, "failed": 0, "updated": 0,
+                      "write_failed": 0}
+        self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # 중간에 끊긴 마지막 줄
+                coord = (rec["lat"], rec["lng"]) if rec.get("lat") is not None else None
+                self.cache[rec["address"]] = coord
+        self.stats["resumed"] = len(self.cache)
+
+    def _append_checkpoint(self, fh, address: str, coord: Optional[Coord]):
+        if fh is None:
+            return
+        lat, lng = coord if coord else (None, None)
+        fh.write(json.dumps({"address": address, "lat": lat, "lng": lng}, ensure_ascii=False) + "\n")
+        fh.flush()
+
+    async def _lookup(self, address: str) -> Optional[Coord]:
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.wait()
+            try:
+                return await self.geocoder.geocode(address)
+            except RateLimited as e:
+                self.limiter.pause(e.retry_after)
+            except httpx.HTTPError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(0.5 * (2 ** attempt))
+        raise RateLimited()
+
+    async def run(self, stores: Iterable[Dict[str, Any]],
+                  update: Optional[Callable[[str, Coord], Awaitable[None]]] = None) -> List[Tuple[str, Coord]]:
+        """
+        좌표 없는 상점의 주소를 지오코딩하고 update(store_id, (lat, lng)) 로 기록.
+        반환: 좌표를 채운 (store_id, 좌표) 목록
+        """
+        by_address: Dict[str, List[str]] = {}
+        for s in stores:
+            self.stats["stores"] += 1
+            if s.get("latitude") is not None and s.get("longitude") is not None:
+                continue
+            address = normalize_address(s.get("address") or "")
+            store_id = s.get("id") or s.get("surveyId")
+            if not address or not store_id:
+                continue
+            self.stats["missing"] += 1
+            by_address.setdefault(address, []).append(store_id)
+
+        todo = [a for a in by_address if a not in self.cache]
+        fh = open(self.checkpoint_path, "a", encoding="utf-8") if self.checkpoint_path else None
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def worker(address: str):
+            async with sem:
+                try:
+                    coord = await self._lookup(address)
+                except Exception as e:
+                    # 실패한 주소는 체크포인트에 남기지 않아 재실행 때 다시 시도
+                    self.stats["failed"] += 1
+                    print(f"[GEOCODE] failed: {address} ({e})")
+                    return
+                self.stats["lookups"] += 1
+                self.cache[address] = coord
+                self._append_checkpoint(fh, address, coord)
+
+        try:
+            await asyncio.gather(*(worker(a) for a in todo))
+        finally:
+            if fh is not None:
+                fh.close()
+
+        filled = [(store_id, self.cache[address])
+                  for address, ids in by_address.items() if self.cache.get(address) is not None
+                  for store_id in ids]
+
+        async def write(store_id: str, coord: Coord) -> bool:
+            # 지오코딩과 같은 동시성 제한 안에서 기록 (상점마다 스레드 왕복이라 순차로 하면 느림)
+            async with sem:
+                try:
+                    await update(store_id, coord)
+                    return True
+                except Exception as e:
+                    self.stats["write_failed"] += 1
+                    print(f"[GEOCODE] update failed: {store_id} ({e})")
+                    return False
+
+        if update is not None:
+            ok = await asyncio.gather(*(write(store_id, coord) for store_id, coord in filled))
+            filled = [item for item, written in zip(filled, ok) if written]
+        self.stats["updated"] = len(filled)
+        return filled
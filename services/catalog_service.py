@@ -0,0 +1,82 @@
+# catalog_service.py
+
+import gc
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+from services.geo_shard import GeoIndex
+from utils.config import config
+
+
+class StoreCatalog:
+    """
+    읽기 전용 상점 카탈로그 (store_id -> 상점 dict)
+
+    운영 모드에서는 gunicorn 마스터가 fork 전에 한 번만 로드하고,
+    워커들은 copy-on-write 로 같은 메모리를 공유한다.
+    로드 후에는 내용을 바꾸지 않는다 (바꾸면 워커마다 페이지가 복사됨).
+    """
+
+    def __init__(self):
+        self._stores: Mapping[str, Dict[str, Any]] = MappingProxyType({})
+        self.loaded_at: Optional[float] = None
+        self.geo = GeoIndex(config.GEO_INDEX_PRECISION)
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, stores: Iterable[Dict[str, Any]],
+             keep: Optional[Callable[[Dict[str, Any]], bool]] = None) -> int:
+        """
+        상점 목록으로 카탈로그를 통째로 교체
+        keep: 이 노드가 담당하는 상점만 남길 때 (shard_router.owns_store)
+        """
+        data = {}
+        for s in stores:
+            store_id = s.get('id') or s.get('surveyId')
+            if store_id and (keep is None or keep(s)):
+                data[store_id] = s
+        geo = GeoIndex(config.GEO_INDEX_PRECISION)
+        geo.build(data.values())
+        self._stores = MappingProxyType(data)
+        self.geo = geo
+        self.loaded_at = time.time()
+        return len(data)
+
+    def load_from_pinecone(self, pinecone_service,
+                           keep: Optional[Callable[[Dict[str, Any]], bool]] = None) -> int:
+        """Pinecone 인덱스 전체를 읽어 카탈로그 적재 (동기)"""
+        started = time.perf_counter()
+        count = self.load(pinecone_service.iter_all_stores(), keep=keep)
+        print(f"[CATALOG] loaded {count} stores ({len(self.geo.cells)} geo cells) "
+              f"in {time.perf_counter() - started:.2f}s")
+        return count
+
+    def freeze(self):
+        """
+        fork 직전 호출: 지금까지 만든 객체를 GC 추적 대상에서 빼서
+        워커의 GC 가 공유 페이지를 건드려 복사되는 것을 막는다.
+        """
+        gc.collect()
+        gc.freeze()
+
+    def get(self, store_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not store_id:
+            return None
+        return self._stores.get(store_id)
+
+    def nearby(self, lat: float, lng: float, radius_km: float, top_k: int,
+               shards: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """반경 내 상점을 가까운 순으로 (shards 지정 시 해당 geohash 접두어만)"""
+        return self.geo.nearby(lat, lng, radius_km, top_k, shards=shards)
+
+    def all(self) -> List[Dict[str, Any]]:
+        return list(self._stores.values())
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+
+catalog = StoreCatalog()
@@ -0,0 +1,79 @@
+# event_log.py
+#
+# 대화/분석 이벤트 기록 (검색, 상점 선택, 질문-답변)
+#  - 요청 경로에서는 튜플 하나를 큐에 넣기만 함 (dict 구성/해시/마스킹/직렬화는 기록 스레드에서)
+#  - 사용자 ID 는 HMAC, 자유 텍스트의 긴 숫자열(전화번호 등)은 traffic_capture 와 같은 규칙으로 마스킹
+#  - BufferedJsonlWriter 로 묶어서 gzip JSONL 세그먼트에 기록 (시간/크기 단위 교체)
+#  - 큐가 차면 EVENT_LOG_OVERFLOW 정책으로 버림 (기본: 오래된 것부터)
+#
+# 레코드 예)
+#   {"ts": 1729300000.12, "event": "search", "user": "3f2a...", "route": "recommend",
+#    "mode": "geo", "location": "강남역", "food": "한식", "results": ["s1", "s2"], "latency_ms": 231.4}
+
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Any, Dict, Optional
+
+from services.log_writer import BufferedJsonlWriter
+from services.traffic_capture import mask_digits
+from utils.config import config
+
+
+# 사용자가 입력했거나 답변에 포함된 자유 텍스트 (전화번호 등 마스킹 대상)
+_TEXT_FIELDS = ("utterance", "question", "answer", "location", "food", "error")
+
+
+class EventLog:
+    def __init__(self, directory: str, salt: str, enabled: bool = True,
+                 max_queue: int = 20000, overflow: str = "drop_oldest", rotate_seconds: float = 3600):
+        self.enabled = enabled
+        if enabled and not salt:
+            # 워커마다 키가 달라지면 사용자별 집계가 어긋나므로 EVENT_LOG_SALT 설정 권장
+            print("[EVENT-LOG] EVENT_LOG_SALT not set, using a random per-process key")
+        self.salt = (salt or secrets.token_hex(16)).encode()
+        self.writer = BufferedJsonlWriter(
+            directory, "events",
+            batch_size=500, flush_interval=2.0,
+            max_queue=max_queue, overflow=overflow, rotate_seconds=rotate_seconds,
+            transform=self._to_record,
+        )
+
+    def record(self, event: str, user_key: Optional[str], **fields: Any) -> None:
+        """이벤트 1건 기록 (논블로킹, 실패해도 요청에는 영향 없음)"""
+        if self.enabled:
+            self.writer.write((time.time(), event, user_key, fields))
+
+    def _to_record(self, item) -> Dict[str, Any]:
+        ts, event, user_key, fields = item
+        user = hmac.new(self.salt, user_key.encode(), hashlib.sha256).hexdigest()[:24] if user_key else None
+        for key in _TEXT_FIELDS:
+            if key in fields:
+                fields[key] = mask_digits(fields[key])
+        return {"ts": round(ts, 3), "event": event, "user": user, **fields}
+
+    def start(self):
+        if self.enabled:
+            self.writer.start()
+
+    def close(self):
+        self.writer.close()
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.writer.stats()}
+
+
+def elapsed_ms(started: float) -> float:
+    """time.perf_counter() 기준 경과 시간(ms)"""
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+event_log = EventLog(
+    config.EVENT_LOG_DIR,
+    config.EVENT_LOG_SALT,
+    enabled=config.EVENT_LOG_ENABLED,
+    max_queue=config.EVENT_LOG_MAX_QUEUE,
+    overflow=config.EVENT_LOG_OVERFLOW,
+    rotate_seconds=config.EVENT_LOG_ROTATE_SECONDS,
+)
@@ -0,0 +1,105 @@
+# gazetteer.py
+#
+# 자주 쓰이는 지명(역/대학/번화가)의 오프라인 좌표 사전.
+# geocode_landmark 는 여기서 먼저 찾고, 없을 때만 카카오 로컬 API 를 호출한다.
+#
+# 원본: CSV (name,aliases,lat,lng) / aliases 는 '|' 로 구분
+#   python -m scripts.build_gazetteer raw.csv data/landmarks.csv  (정리/중복 제거)
+
+import bisect
+import csv
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from utils.config import config
+
+_STRIP_RE = re.compile(r"[^0-9a-z가-힣]")
+# "강남역 근처", "강남역 11번 출구" 처럼 지명 뒤에 붙는 말
+_TAIL_RE = re.compile(r"^(근처|주변|부근|인근|앞|쪽|일대|\d+번)")
+
+
+def normalize(text: str) -> str:
+    """NFKC + 소문자 + 공백/기호 제거"""
+    return _STRIP_RE.sub("", unicodedata.normalize("NFKC", text or "").lower())
+
+
+class Gazetteer:
+    def __init__(self):
+        self._exact: Dict[str, int] = {}     # 정규화 키 -> 지명 번호
+        self._keys: List[str] = []            # 접두어 검색용 정렬 키
+        self._places: List[Tuple[str, float, float]] = []  # (이름, lat, lng)
+        self.loaded = False
+
+    def add(self, name: str, lat: float, lng: float, aliases: List[str] = ()):
+        idx = len(self._places)
+        self._places.append((name, lat, lng))
+        keys = {normalize(name), *(normalize(a) for a in aliases)}
+        for k in keys:
+            if k:
+                self._exact.setdefault(k, idx)
+
+    def load_csv(self, path: str) -> int:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    lat, lng = float(row["lat"]), float(row["lng"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                aliases = [a.strip() for a in (row.get("aliases") or "").split("|") if a.strip()]
+                self.add(row["name"].strip(), lat, lng, aliases)
+        self._keys = sorted(self._exact)
+        self.loaded = True
+        return len(self._places)
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        try:
+            count = self.load_csv(config.GAZETTEER_PATH)
+            print(f"[GAZETTEER] loaded {count} landmarks")
+        except FileNotFoundError:
+            print(f"[GAZETTEER] {config.GAZETTEER_PATH} not found, remote geocoding only")
+            self.loaded = True
+
+    def places(self) -> List[Tuple[str, float, float]]:
+        """등록된 지명 목록 (이름, lat, lng)"""
+        self.ensure_loaded()
+        return list(self._places)
+
+    def _result(self, idx: int):
+        name, lat, lng = self._places[idx]
+        return {"lat": lat, "lng": lng, "name": name}
+
+    def lookup(self, text: Optional[str]) -> Optional[Dict[str, float]]:
+        """지명 → {"lat", "lng", "name"} / 못 찾으면 None"""
+        self.ensure_loaded()
+        q = normalize(text)
+        if len(q) < 2:
+            return None
+
+        # 1) 정확히 일치
+        idx = self._exact.get(q)
+        if idx is not None:
+            return self._result(idx)
+
+        # 2) "강남역 근처" → 알려진 지명 + 위치 표현
+        for end in range(len(q) - 1, 1, -1):
+            idx = self._exact.get(q[:end])
+            if idx is not None and _TAIL_RE.match(q[end:]):
+                return self._result(idx)
+
+        # 3) "홍대입" → 입력으로 시작하는 지명이 하나뿐일 때만
+        pos = bisect.bisect_left(self._keys, q)
+        found = set()
+        while pos < len(self._keys) and self._keys[pos].startswith(q):
+            found.add(self._exact[self._keys[pos]])
+            if len(found) > 1:
+                return None
+            pos += 1
+        if found:
+            return self._result(found.pop())
+        return None
+
+
+gazetteer = Gazetteer()
@@ -0,0 +1,207 @@
+# geo_shard.py
+#
+# 지역(geohash 접두어) 단위 카탈로그 분할과 요청 라우팅
+#  - 상점은 geohash 접두어(SHARD_PRECISION 자리)로 샤드가 정해진다
+#  - 노드는 LOCAL_SHARDS 에 해당하는 상점만 메모리에 올린다 (노드를 늘려도 노드당 메모리는 일정)
+#  - 반경 검색은 반경을 덮는 샤드를 계산해 로컬은 직접, 다른 노드 샤드는 /internal 로 물어본 뒤 거리순 병합
+#
+# 예) SHARD_PRECISION=3, LOCAL_SHARDS=wyd,wye
+#     SHARD_NODES=wy6=http://10.0.0.2:8000,wy7=http://10.0.0.2:8000,wv=http://10.0.0.3:8000
+
+import asyncio
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+from utils.config import config
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0
+
+
+def geohash(lat: float, lng: float, precision: int) -> str:
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                ch, lng_lo = (ch << 1) | 1, mid
+            else:
+                ch, lng_hi = ch << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch, lat_lo = (ch << 1) | 1, mid
+            else:
+                ch, lat_hi = ch << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    """geohash 한 칸의 (위도 높이, 경도 너비) (도)"""
+    total = precision * 5
+    lng_bits = (total + 1) // 2
+    lat_bits = total // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def covering_cells(lat: float, lng: float, radius_km: float, precision: int) -> Set[str]:
+    """반경 radius_km 원을 덮는 geohash 칸 목록 (경계를 넘는 검색용)"""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * max(math.cos(math.radians(lat)), 1e-6)))
+    h, w = _cell_size(precision)
+    cells = set()
+    y = lat - dlat
+    while True:
+        x = lng - dlng
+        while True:
+            cells.add(geohash(max(-90.0, min(90.0, y)), x, precision))
+            if x >= lng + dlng:
+                break
+            x = min(x + w, lng + dlng)
+        if y >= lat + dlat:
+            break
+        y = min(y + h, lat + dlat)
+    return cells
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GeoIndex:
+    """geohash 칸별 상점 목록 (반경 검색 시 주변 칸만 훑음)"""
+
+    def __init__(self, precision: int):
+        self.precision = precision
+        self.cells: Dict[str, List[Dict[str, Any]]] = {}
+
+    def build(self, stores: Iterable[Dict[str, Any]]):
+        cells: Dict[str, List[Dict[str, Any]]] = {}
+        for s in stores:
+            if s.get('latitude') is None or s.get('longitude') is None:
+                continue
+            cells.setdefault(geohash(s['latitude'], s['longitude'], self.precision), []).append(s)
+        self.cells = cells
+
+    def nearby(self, lat: float, lng: float, radius_km: float, top_k: int,
+               shards: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        found = []
+        for cell in covering_cells(lat, lng, radius_km, self.precision):
+            if shards is not None and not any(cell.startswith(sh) for sh in shards):
+                continue
+            for s in self.cells.get(cell, ()):
+                d = haversine_km(lat, lng, s['latitude'], s['longitude'])
+                if d <= radius_km:
+                    found.append((d, s))
+        found.sort(key=lambda x: x[0])
+        # 카탈로그 객체는 공유(읽기 전용)이므로 복사본에 거리 추가
+        return [{**s, 'distance': round(d, 2)} for d, s in found[:top_k]]
+
+
+class ShardRouter:
+    def __init__(self, precision: int, local_shards: str, shard_nodes: str):
+        self.precision = precision
+        local = {p.strip() for p in (local_shards or "*").split(",") if p.strip()}
+        self.all_local = "*" in local
+        self.local = set() if self.all_local else local
+        # 접두어 -> 노드 URL (긴 접두어 우선)
+        self.nodes: Dict[str, str] = {}
+        for pair in (shard_nodes or "").split(","):
+            if "=" in pair:
+                prefix, url = pair.split("=", 1)
+                self.nodes[prefix.strip()] = url.strip().rstrip("/")
+        self._client: Optional[httpx.AsyncClient] = None
+        self.counters = {"local": 0, "remote": 0, "remote_errors": 0, "unowned": 0}
+
+    def shard_of(self, lat: float, lng: float) -> str:
+        return geohash(lat, lng, self.precision)
+
+    def is_local(self, shard: str) -> bool:
+        return self.all_local or any(shard.startswith(p) for p in self.local)
+
+    def owns_store(self, store: Dict[str, Any]) -> bool:
+        """이 노드 카탈로그에 올릴 상점인지 (좌표 없는 상점은 전체 담당 노드만)"""
+        if store.get('latitude') is None or store.get('longitude') is None:
+            return self.all_local
+        return self.is_local(self.shard_of(store['latitude'], store['longitude']))
+
+    def node_for(self, shard: str) -> Optional[str]:
+        best = None
+        for prefix, url in self.nodes.items():
+            if shard.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+                best = (prefix, url)
+        return best[1] if best else None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=config.SHARD_TIMEOUT,
+                                             headers={"X-Internal-Token": config.INTERNAL_TOKEN})
+        return self._client
+
+    async def nearby(self, catalog, lat: float, lng: float, radius_km: float, top_k: int) -> List[Dict[str, Any]]:
+        """반경 검색: 로컬 샤드 + 원격 노드 결과를 거리순 병합"""
+        shards = covering_cells(lat, lng, radius_km, self.precision)
+        local = {s for s in shards if self.is_local(s)}
+        remote: Dict[str, Set[str]] = {}
+        for s in shards - local:
+            url = self.node_for(s)
+            if url is None:
+                self.counters["unowned"] += 1
+                continue
+            remote.setdefault(url, set()).add(s)
+
+        results = self._search_local(catalog, lat, lng, radius_km, top_k, local) if local else []
+        self.counters["local"] += 1 if local else 0
+        if remote:
+            self.counters["remote"] += len(remote)
+            responses = await asyncio.gather(
+                *(self._remote_nearby(url, lat, lng, radius_km, top_k) for url in remote),
+                return_exceptions=True,
+            )
+            for resp in responses:
+                if isinstance(resp, Exception):
+                    # 다른 노드 장애 시 그 지역만 빠진 결과라도 반환
+                    self.counters["remote_errors"] += 1
+                    print(f"[SHARD] remote nearby failed: {resp!r}")
+                    continue
+                results.extend(resp)
+            results.sort(key=lambda s: s.get('distance', 0.0))
+        return results[:top_k]
+
+    def local_nearby(self, catalog, lat: float, lng: float, radius_km: float, top_k: int) -> List[Dict[str, Any]]:
+        """이 노드 담당 샤드만 검색 (/internal/stores/nearby 용, 다른 노드로 다시 넘기지 않음)"""
+        shards = {s for s in covering_cells(lat, lng, radius_km, self.precision) if self.is_local(s)}
+        return self._search_local(catalog, lat, lng, radius_km, top_k, shards) if shards else []
+
+    def _search_local(self, catalog, lat, lng, radius_km, top_k, shards: Set[str]):
+        return catalog.nearby(lat, lng, radius_km, top_k, shards=None if self.all_local else shards)
+
+    async def _remote_nearby(self, url: str, lat: float, lng: float, radius_km: float, top_k: int):
+        r = await self._http().get(f"{url}/internal/stores/nearby",
+                                   params={"lat": lat, "lng": lng, "radius_km": radius_km, "top_k": top_k})
+        r.raise_for_status()
+        return r.json()["stores"]
+
+    def stats(self) -> dict:
+        return {"precision": self.precision,
+                "local_shards": "*" if self.all_local else sorted(self.local),
+                "nodes": len(set(self.nodes.values())), **self.counters}
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+shard_router = ShardRouter(config.SHARD_PRECISION, config.LOCAL_SHARDS, config.SHARD_NODES)
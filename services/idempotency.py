@@ -0,0 +1,75 @@
+# idempotency.py
+#
+# 카카오 재시도/버튼 연타로 들어오는 중복 스킬 요청 처리
+#  - 처리 중인 같은 요청은 하나의 결과를 함께 기다림 (single-flight)
+#  - 방금 끝난 같은 요청은 짧은 시간 동안 캐시된 응답을 그대로 반환
+
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from models.schemas import KakaoSkillRequest
+from utils.config import config
+
+
+class IdempotencyGuard:
+    def __init__(self, window: float = 5.0, max_size: int = 10000):
+        self.window = window
+        self.max_size = max_size
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._done: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()  # key -> (만료시각, 응답)
+        self.counters: Counter = Counter()
+
+    @staticmethod
+    def key_for(route: str, body: KakaoSkillRequest, cursor: Optional[int] = None) -> Tuple:
+        """
+        사용자 + 블록 + 발화 + 버튼 extra 가 같으면 같은 요청
+        cursor: extra 에 커서가 없을 때 쓸 세션 커서 (result_pager.dedup_cursor)
+        """
+        extra = body.client_extra
+        return (route, body.user_key, body.block_id, body.utterance,
+                extra.get("store_id") or extra.get("store_name"), extra.get("cursor", cursor))
+
+    async def run(self, key: Hashable, handler: Callable[[], Awaitable[Any]]) -> Any:
+        self.counters["requests"] += 1
+        now = time.monotonic()
+
+        done = self._done.get(key)
+        if done is not None:
+            if done[0] > now:
+                self.counters["dedup_cached"] += 1
+                return done[1]
+            del self._done[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters["dedup_inflight"] += 1
+            return await asyncio.shield(task)
+
+        # 첫 요청이 끊겨도(카카오 타임아웃) 처리는 계속되어 재시도 요청이 결과를 받도록 별도 태스크로 실행
+        task = asyncio.ensure_future(handler())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return  # 실패한 요청은 캐시하지 않음
+        self._done[key] = (time.monotonic() + self.window, task.result())
+        self._done.move_to_end(key)
+        while len(self._done) > self.max_size:
+            self._done.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.counters["requests"]
+        deduped = self.counters["dedup_cached"] + self.counters["dedup_inflight"]
+        return {
+            **self.counters,
+            "inflight": len(self._inflight),
+            "dedup_rate": round(deduped / requests, 4) if requests else 0.0,
+        }
+
+
+idempotency = IdempotencyGuard(window=config.IDEMPOTENCY_WINDOW)
@@ -1,8 +1,61 @@
 import os
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
 import httpx
+import orjson
+from models.schemas import KakaoSkillRequest
+from services.resilience import kakao_local, UpstreamUnavailable
+from services.gazetteer import gazetteer
+from utils.config import config
+
+DETAIL_BLOCK_ID = "68c908701d1fc539f4e2eae5"
+
+# 캐러셀 응답 앞/뒤 고정 부분 (가운데에 카드 조각을 이어붙임)
+_CAROUSEL_HEAD = b'{"version":"2.0","template":{"outputs":[{"carousel":{"type":"basicCard","items":['
+_CAROUSEL_ITEMS_END = b']}}]'
+_TEMPLATE_END = b'}}'
+_CARD_CACHE_SIZE = 5000
+CAROUSEL_MAX = 10  # 카카오 캐러셀 카드 최대 개수 (페이지 크기는 result_pager 가 정함)
+
+
+def _raise_if_unavailable(r: httpx.Response):
+    """레이트리밋/서버 오류는 장애로 취급 (서킷 브레이커에 반영)"""
+    if r.status_code == 429 or r.status_code >= 500:
+        r.raise_for_status()
+
+
+def _store_version(s: Dict[str, Any]) -> Tuple:
+    """카드 렌더링에 쓰이는 값이 바뀌면 키도 바뀌도록 버전 키 생성"""
+    if s.get('version') is not None:
+        return (s.get('id'), s.get('version'))
+    services = s.get('services') or []
+    menus = tuple(sv.get('menu', '') for sv in services[:3] if isinstance(sv, dict))
+    return (s.get('id'), s.get('name'), s.get('industry'), s.get('address'), s.get('image_url'), menus)
+
 
 class KakaoService:
+    # store version -> 직렬화된 카드 조각 (LRU)
+    _card_cache: "OrderedDict[Tuple, bytes]" = OrderedDict()
+    # 카카오 로컬 API 커넥션 풀 (프로세스당 1개, 첫 사용/워밍업 때 생성)
+    _http: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def http_client(cls) -> httpx.AsyncClient:
+        if cls._http is None:
+            cls._http = httpx.AsyncClient(base_url=config.KAKAO_LOCAL_BASE_URL, timeout=config.KAKAO_LOCAL_TIMEOUT)
+        return cls._http
+
+    @classmethod
+    async def aclose(cls):
+        if cls._http is not None:
+            await cls._http.aclose()
+            cls._http = None
+
+    @staticmethod
+    def parse_skill_request(raw: bytes) -> KakaoSkillRequest:
+        """스킬 요청 바디를 dict 를 거치지 않고 바로 모델로 검증"""
+        return KakaoSkillRequest.model_validate_json(raw or b"{}")
+
     @staticmethod
     def create_text_response(text: str) -> Dict[str, Any]:
         """간단한 텍스트 응답"""
@@ -20,38 +73,76 @@ class KakaoService:
         }
     
     @staticmethod
-    def create_list_card_response(stores: List[Dict[str, Any]]) -> Dict[str, Any]:
-        items = []
-        for s in stores[:5]:
-            services = s.get('services') or []
-            menu_text = ", ".join([sv.get('menu', '') for sv in services[:3] if sv.get('menu')])
-            items.append({
-                "title": (s.get('name') or "")[:30],
-                "description": f"{s.get('industry', '')} | {s.get('address', '')}\n메뉴: {menu_text}"[:100],
-                "thumbnail": {"imageUrl": s.get('image_url', '')},
-                "buttons": [{
+    def _build_card(s: Dict[str, Any]) -> Dict[str, Any]:
+        services = s.get('services') or []
+        menu_text = ", ".join([sv.get('menu', '') for sv in services[:3] if sv.get('menu')])
+        return {
+            "title": (s.get('name') or "")[:30],
+            "description": f"{s.get('industry', '')} | {s.get('address', '')}\n메뉴: {menu_text}"[:100],
+            "thumbnail": {"imageUrl": s.get('image_url', '')},
+            "buttons": [{
                 "label": "상세보기",
                 "action": "block",
-                "blockId": "68c908701d1fc539f4e2eae5",
+                "blockId": DETAIL_BLOCK_ID,
                 "extra": {
                     "store_id": s.get('id'),
                     "store_name": s.get('name', "")
                 }
             }]
-        })
+        }
+
+    @classmethod
+    def card_fragment(cls, s: Dict[str, Any]) -> bytes:
+        """상점 카드 1개를 미리 직렬화한 조각 (버전별 캐시)"""
+        key = _store_version(s)
+        frag = cls._card_cache.get(key)
+        if frag is not None:
+            cls._card_cache.move_to_end(key)
+            return frag
+        frag = orjson.dumps(cls._build_card(s))
+        cls._card_cache[key] = frag
+        if len(cls._card_cache) > _CARD_CACHE_SIZE:
+            cls._card_cache.popitem(last=False)
+        return frag
 
+    @staticmethod
+    def more_quick_reply(cursor: int) -> Dict[str, Any]:
+        """"더보기" 바로가기 (블록 ID 가 설정돼 있으면 커서를 extra 로 전달)"""
+        if config.KAKAO_RECOMMEND_BLOCK_ID:
+            return {"label": "더보기", "action": "block", "messageText": "더보기",
+                    "blockId": config.KAKAO_RECOMMEND_BLOCK_ID, "extra": {"cursor": cursor}}
+        return {"label": "더보기", "action": "message", "messageText": "더보기"}
+
+    @classmethod
+    def render_list_card(cls, stores: List[Dict[str, Any]], next_cursor: Optional[int] = None) -> bytes:
+        """
+        캐러셀 응답을 캐시된 카드 조각을 이어붙여 바로 bytes 로 생성
+        next_cursor: 다음 페이지가 있으면 "더보기" 바로가기 추가
+        """
+        body = _CAROUSEL_HEAD + b",".join([cls.card_fragment(s) for s in stores[:CAROUSEL_MAX]]) + _CAROUSEL_ITEMS_END
+        if next_cursor is not None:
+            body += b',"quickReplies":' + orjson.dumps([cls.more_quick_reply(next_cursor)])
+        return body + _TEMPLATE_END
+
+    @staticmethod
+    def create_list_card_response(stores: List[Dict[str, Any]], next_cursor: Optional[int] = None) -> Dict[str, Any]:
+        items = [KakaoService._build_card(s) for s in stores[:CAROUSEL_MAX]]
+
+        template = {
+            "outputs": [
+                {
+                    "carousel": {
+                        "type": "basicCard",
+                        "items": items
+                    }
+                }
+            ]
+        }
+        if next_cursor is not None:
+            template["quickReplies"] = [KakaoService.more_quick_reply(next_cursor)]
         return {
             "version": "2.0",
-            "template": {
-                "outputs": [
-                    {
-                        "carousel": {
-                            "type": "basicCard",
-                            "items": items
-                        }
-                    }
-                ]
-            }
+            "template": template
         }
     
     @staticmethod
@@ -110,48 +201,57 @@ class KakaoService:
     async def geocode_landmark(location_text: Optional[str], fallback_text: Optional[str]) -> Optional[Dict[str, Any]]:
         """
         우선순위: location_text -> fallback_text(sys_location)
-        카카오 로컬 API로 좌표(lat, lng) 조회. 성공 시 {"lat": float, "lng": float, "name": str} 반환.
+        오프라인 지명 사전에 있으면 바로 반환, 없을 때만 카카오 로컬 API로 좌표(lat, lng) 조회. 성공 시 {"lat": float, "lng": float, "name": str} 반환.
         """
         query = (location_text or fallback_text or "").strip()
         if not query:
             return None
 
+        # 역/대학/번화가 등 자주 쓰는 지명은 네트워크 없이 처리
+        hit = gazetteer.lookup(query)
+        if hit:
+            return hit
+
         api_key = os.getenv("KAKAO_REST_API_KEY", "")
         if not api_key:
             # 키 없으면 좌표 변환 불가
             return None
 
         headers = {"Authorization": f"KakaoAK {api_key}"}
-        base = "https://dapi.kakao.com"
 
-        # 1) 키워드 검색
-        try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                r = await client.get(f"{base}/v2/local/search/keyword.json",
-                                     params={"query": query, "size": 1},
-                                     headers=headers)
-                if r.status_code == 200:
-                    docs = r.json().get("documents", [])
-                    if docs:
-                        y = float(docs[0]["y"])  # lat
-                        x = float(docs[0]["x"])  # lng
-                        name = docs[0].get("place_name") or query
-                        return {"lat": y, "lng": x, "name": name}
-
-                # 2) 주소 검색 (키워드 실패 시)
-                r2 = await client.get(f"{base}/v2/local/search/address.json",
-                                      params={"query": query},
-                                      headers=headers)
-                if r2.status_code == 200:
-                    docs = r2.json().get("documents", [])
-                    if docs:
-                        d = docs[0]
-                        y = float(d["y"])
-                        x = float(d["x"])
-                        name = d.get("address_name") or query
-                        return {"lat": y, "lng": x, "name": name}
-        except Exception:
-            # 타임아웃/네트워크 예외는 None 반환
+        async def _lookup() -> Optional[Dict[str, Any]]:
+            client = KakaoService.http_client()
+            # 1) 키워드 검색
+            r = await client.get("/v2/local/search/keyword.json",
+                                 params={"query": query, "size": 1},
+                                 headers=headers)
+            _raise_if_unavailable(r)
+            if r.status_code == 200:
+                docs = r.json().get("documents", [])
+                if docs:
+                    y = float(docs[0]["y"])  # lat
+                    x = float(docs[0]["x"])  # lng
+                    name = docs[0].get("place_name") or query
+                    return {"lat": y, "lng": x, "name": name}
+
+            # 2) 주소 검색 (키워드 실패 시)
+            r2 = await client.get("/v2/local/search/address.json",
+                                  params={"query": query},
+                                  headers=headers)
+            _raise_if_unavailable(r2)
+            if r2.status_code == 200:
+                docs = r2.json().get("documents", [])
+                if docs:
+                    d = docs[0]
+                    y = float(d["y"])
+                    x = float(d["x"])
+                    name = d.get("address_name") or query
+                    return {"lat": y, "lng": x, "name": name}
             return None
 
-        return None
\ No newline at end of file
+        try:
+            # 장애 시 같은 지명의 최근 좌표로 대체
+            return await kakao_local.call(_lookup, cache_key=query)
+        except UpstreamUnavailable:
+            # 캐시도 없으면 None → 텍스트 검색으로 백업
+            return None
@@ -0,0 +1,156 @@
+# log_writer.py
+#
+# 요청 경로에서 I/O 를 하지 않는 append-only JSONL 기록기.
+#  - write() 는 큐에 넣기만 하고 바로 반환 (큐가 차면 새 항목 또는 가장 오래된 항목을 버림)
+#  - 백그라운드 스레드가 모아서 batch_size 개 또는 flush_interval 초마다 기록
+#  - 기록 단위마다 gzip member 로 붙여 씀 → 중간에 죽어도 앞부분은 그대로 읽힘
+#  - 파일이 rotate_bytes 를 넘거나 rotate_seconds 가 지나면 새 파일(세그먼트)로 교체
+
+import gzip
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+import orjson
+
+
+class BufferedJsonlWriter:
+    def __init__(self, directory: str, prefix: str,
+                 batch_size: int = 200, flush_interval: float = 1.0,
+                 max_queue: int = 10000, rotate_bytes: int = 64 * 1024 * 1024,
+                 transform: Optional[Callable[[Any], Optional[dict]]] = None,
+                 overflow: str = "drop_new", rotate_seconds: float = 0):
+        """
+        transform: 기록 스레드에서 항목을 dict 로 바꾸는 함수 (None 반환 시 건너뜀).
+                   파싱/익명화 같은 작업을 요청 경로 밖에서 하기 위해 사용.
+        overflow: 큐가 찼을 때 "drop_new"(새 항목 버림) 또는 "drop_oldest"(오래된 항목 버리고 추가).
+                  이벤트 루프에서 호출되므로 기다리는(block) 정책은 두지 않는다.
+        rotate_seconds: 0 보다 크면 이 시간마다 새 파일 (시간 단위 분석용 세그먼트)
+        """
+        if overflow not in ("drop_new", "drop_oldest"):
+            raise ValueError(f"unknown overflow policy: {overflow}")
+        self.directory = directory
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.transform = transform
+        self.overflow = overflow
+        self.rotate_seconds = rotate_seconds
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._path: Optional[str] = None
+        self._opened_at = 0.0
+        self.written = 0
+        self.dropped = 0
+        self.files = 0
+
+    # ---------- 요청 경로 ----------
+
+    def write(self, item: Any) -> bool:
+        """블로킹 없이 큐에 추가. 큐가 가득 차면 overflow 정책대로 버리고 False"""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.overflow == "drop_oldest":
+                try:
+                    self._queue.get_nowait()
+                    self._queue.put_nowait(item)
+                except (queue.Empty, queue.Full):
+                    pass
+            return False
+
+    # ---------- 백그라운드 ----------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.prefix}-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        """남은 항목을 기록하고 종료"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        batch: List[Any] = []
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+            stopping = self._stop.is_set()
+            if stopping:
+                # 종료 시 큐에 남은 것까지 비움
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            if batch and (len(batch) >= self.batch_size or stopping
+                          or time.monotonic() - last_flush >= self.flush_interval):
+                self._flush(batch)
+                batch = []
+                last_flush = time.monotonic()
+            elif not batch:
+                last_flush = time.monotonic()
+            if stopping:
+                return
+
+    def _flush(self, batch: List[Any]):
+        lines = []
+        for item in batch:
+            try:
+                record = self.transform(item) if self.transform else item
+                if record is not None:
+                    lines.append(orjson.dumps(record))
+            except Exception as e:
+                print(f"[LOG-WRITER] {self.prefix}: skip record ({e})")
+        if not lines:
+            return
+        try:
+            path = self._current_path()
+            with open(path, "ab") as f:
+                f.write(gzip.compress(b"\n".join(lines) + b"\n", compresslevel=6))
+            self.written += len(lines)
+        except OSError as e:
+            self.dropped += len(lines)
+            print(f"[LOG-WRITER] {self.prefix}: write failed ({e})")
+
+    def _current_path(self) -> str:
+        expired = self.rotate_seconds > 0 and time.monotonic() - self._opened_at >= self.rotate_seconds
+        if self._path is None or expired or (os.path.exists(self._path) and os.path.getsize(self._path) >= self.rotate_bytes):
+            self._opened_at = time.monotonic()
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self._path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{os.getpid()}-{self.files}.jsonl.gz")
+            self.files += 1
+        return self._path
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "written": self.written,
+                "dropped": self.dropped, "files": self.files}
+
+
+def read_jsonl_gz(path: str):
+    """기록된 파일 읽기 (여러 gzip member 연결 형식)"""
+    with gzip.open(path, "rb") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
+        except EOFError:
+            # 기록 도중 종료되어 마지막 member 가 잘린 경우
+            return
@@ -0,0 +1,126 @@
+# model_router.py
+#
+# chat_completion 호출마다 사용할 모델 선택
+#  - 기본은 빠른 소형 모델
+#  - 어려운 질문/긴 프롬프트는 상위 모델로 승격
+#  - 모델별 실시간 지연/오류율을 보고 요청별 지연 예산을 넘길 모델은 피함
+
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.resilience import LatencyTracker
+from utils.config import config
+
+# 이런 말이 들어가면 비교/추론이 필요한 질문으로 보고 상위 모델 사용
+_HARD_KEYWORDS = ("비교", "차이", "왜", "이유", "추천", "알레르기", "성분", "예약", "단체", "코스", "어떤 게 나아", "뭐가 나아")
+_GREETINGS = ("안녕", "하이", "hello", "ㅎㅇ", "반가", "고마", "감사")
+
+# 작업별 기본 지연 예산 (ms)
+_TASK_BUDGET_MS = {
+    "greeting": 2000,
+    "store_match": 2000,
+    "store_qa": 4000,
+    "store_qa_hard": 8000,
+}
+
+
+class ModelStats:
+    """모델 1개의 최근 지연/오류 통계"""
+
+    def __init__(self, window: int = 50, ttl: float = 300.0):
+        self.window = window
+        self.ttl = ttl
+        self.reset()
+
+    def reset(self):
+        self.latency = LatencyTracker(size=200, min_samples=5)
+        self.results: deque = deque(maxlen=self.window)  # True=성공
+        self.updated_at = 0.0
+
+    def record(self, seconds: float, ok: bool):
+        if ok:
+            self.latency.add(seconds)
+        self.results.append(ok)
+        self.updated_at = time.monotonic()
+
+    def expire(self):
+        """한동안 트래픽이 없던 모델은 통계를 비워 다시 시도해 볼 수 있게 함"""
+        if self.results and time.monotonic() - self.updated_at > self.ttl:
+            self.reset()
+
+    @property
+    def error_rate(self) -> float:
+        if not self.results:
+            return 0.0
+        return 1.0 - sum(self.results) / len(self.results)
+
+    def p95_ms(self) -> Optional[float]:
+        p = self.latency.percentile(0.95)
+        return None if p is None else p * 1000
+
+
+class ModelRouter:
+    def __init__(self, fast_model: str, strong_model: str,
+                 long_prompt_chars: int = 3000, max_error_rate: float = 0.3):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.long_prompt_chars = long_prompt_chars
+        self.max_error_rate = max_error_rate
+        self.stats: Dict[str, ModelStats] = {fast_model: ModelStats(), strong_model: ModelStats()}
+        self.decisions: Counter = Counter()
+
+    @staticmethod
+    def classify_question(user_message: str) -> str:
+        """상점 상담 질문을 작업 유형으로 분류"""
+        text = (user_message or "").strip().lower()
+        if not text or (len(text) <= 15 and any(g in text for g in _GREETINGS)):
+            return "greeting"
+        if any(k in text for k in _HARD_KEYWORDS) or len(text) > 120:
+            return "store_qa_hard"
+        return "store_qa"
+
+    def _healthy(self, model: str, budget_ms: float) -> bool:
+        st = self.stats.setdefault(model, ModelStats())
+        st.expire()
+        if st.error_rate > self.max_error_rate:
+            return False
+        p95 = st.p95_ms()
+        return p95 is None or p95 <= budget_ms
+
+    def choose(self, task: str, messages: List[Dict[str, str]],
+               latency_budget_ms: Optional[float] = None) -> Tuple[str, str]:
+        """(모델, 선택 이유) 반환"""
+        budget = latency_budget_ms or _TASK_BUDGET_MS.get(task, config.OPENAI_LATENCY_BUDGET_MS)
+        prompt_chars = sum(len(m.get("content") or "") for m in messages)
+
+        if task == "store_qa_hard":
+            model, reason = self.strong_model, "hard_question"
+        elif prompt_chars > self.long_prompt_chars and task not in ("greeting", "store_match"):
+            model, reason = self.strong_model, "long_prompt"
+        else:
+            model, reason = self.fast_model, "default"
+
+        # 예산 초과/오류가 잦은 모델은 다른 쪽으로
+        if not self._healthy(model, budget):
+            other = self.fast_model if model == self.strong_model else self.strong_model
+            if self._healthy(other, budget):
+                model, reason = other, f"{reason}->fallback"
+
+        self.decisions[(task, model, reason)] += 1
+        return model, reason
+
+    def record(self, model: str, started: float, ok: bool):
+        self.stats.setdefault(model, ModelStats()).record(time.perf_counter() - started, ok)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "models": {
+                name: {"p95_ms": st.p95_ms(), "error_rate": round(st.error_rate, 3)}
+                for name, st in self.stats.items()
+            },
+            "decisions": {"/".join(k): v for k, v in self.decisions.items()},
+        }
+
+
+model_router = ModelRouter(config.OPENAI_FAST_MODEL, config.OPENAI_API_MODEL)
@@ -0,0 +1,267 @@
+# openai_scheduler.py
+#
+# OpenAI 아웃바운드 호출 스케줄러
+#  - 응답의 x-ratelimit-* 헤더로 남은 RPM/TPM 추적, 소진 시 리셋까지 대기 (429 재시도 폭주 방지)
+#  - 우선순위 큐: 대화(interactive) > 검색 임베딩 > 백그라운드 작업
+#  - 대기열 상한 초과, 또는 호출자 예산(max_wait) 안에 슬롯/한도가 안 나면 거절 (backpressure)
+#    → 보내지도 않은 요청이 Upstream 타임아웃으로 잡혀 브레이커 실패가 되지 않도록 Overloaded 로
+#  - 동시에 들어온 임베딩 요청을 짧게 모아 embeddings.create 한 번으로 처리
+
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.resilience import Overloaded
+from utils.config import config
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SEARCH = 1
+PRIORITY_BACKGROUND = 10
+
+_DURATION_RE = re.compile(r"([\d.]+)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """'1s', '6m0s', '120ms' 같은 리셋 시간 문자열 → 초"""
+    if not value:
+        return None
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(n) * _UNIT_SECONDS[u] for n, u in parts)
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitState:
+    """모델 1개의 남은 요청/토큰 한도"""
+
+    def __init__(self):
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.reset_requests_at = 0.0
+        self.reset_tokens_at = 0.0
+        self.paused_until = 0.0
+
+    def update(self, headers):
+        now = time.monotonic()
+        rr = _int_header(headers, "x-ratelimit-remaining-requests")
+        rt = _int_header(headers, "x-ratelimit-remaining-tokens")
+        if rr is not None:
+            self.remaining_requests = rr
+            self.reset_requests_at = now + (parse_reset(headers.get("x-ratelimit-reset-requests")) or 0.0)
+        if rt is not None:
+            self.remaining_tokens = rt
+            self.reset_tokens_at = now + (parse_reset(headers.get("x-ratelimit-reset-tokens")) or 0.0)
+
+    def on_rate_limited(self, retry_after: Optional[float]):
+        self.paused_until = max(self.paused_until, time.monotonic() + (retry_after or 1.0))
+
+    def consume(self, est_tokens: int):
+        # 응답 헤더가 오기 전까지 동시에 나가는 요청만큼 미리 차감
+        if self.remaining_requests is not None:
+            self.remaining_requests -= 1
+        if self.remaining_tokens is not None:
+            self.remaining_tokens -= est_tokens
+
+    def wait_time(self, est_tokens: int) -> float:
+        now = time.monotonic()
+        wait = self.paused_until - now
+        if self.remaining_requests is not None and self.remaining_requests <= 0:
+            wait = max(wait, self.reset_requests_at - now)
+        if self.remaining_tokens is not None and self.remaining_tokens < est_tokens:
+            wait = max(wait, self.reset_tokens_at - now)
+        return max(0.0, wait)
+
+
+class OutboundScheduler:
+    def __init__(self, max_concurrency: int = 16, max_queue: int = 200, max_retries: int = 2):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.in_flight = 0
+        self.limits: Dict[str, RateLimitState] = {}
+        self._waiters: List[list] = []  # [priority, seq, future, bucket, est_tokens]
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.counters: Counter = Counter()
+
+    def _limit(self, bucket: str) -> RateLimitState:
+        state = self.limits.get(bucket)
+        if state is None:
+            state = self.limits[bucket] = RateLimitState()
+        return state
+
+    # ---------- 슬롯 획득/반납 ----------
+
+    async def _acquire(self, priority: int, bucket: str, est_tokens: int, max_wait: Optional[float]):
+        quota_wait = self._limit(bucket).wait_time(est_tokens)
+        if not self._waiters and self.in_flight < self.max_concurrency and quota_wait == 0:
+            self._take(bucket, est_tokens)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise Overloaded("openai_scheduler", "queue full")
+        if max_wait is not None and quota_wait > max_wait:
+            # 한도 리셋이 예산보다 늦음 → 기다리지 않고 바로 거절
+            self.counters["rejected_quota"] += 1
+            raise Overloaded("openai_scheduler", f"rate limit resets in {quota_wait:.1f}s")
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), fut, bucket, est_tokens])
+        self.counters["queued"] += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(fut, max_wait)
+        except asyncio.TimeoutError:
+            # 예산 안에 슬롯을 못 받음 (wait_for 가 fut 를 취소해 대기열에서 빠짐)
+            self.counters["rejected_wait"] += 1
+            raise Overloaded("openai_scheduler", "queue wait exceeded budget") from None
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 슬롯을 받은 직후 취소됨 → 반납
+                self._release()
+            raise
+
+    def _take(self, bucket: str, est_tokens: int):
+        self.in_flight += 1
+        self._limit(bucket).consume(est_tokens)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """대기열 맨 앞부터 가능한 만큼 슬롯 배정"""
+        while self._waiters and self.in_flight < self.max_concurrency:
+            priority, _, fut, bucket, est_tokens = self._waiters[0]
+            if fut.done():  # 취소된 대기자
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._limit(bucket).wait_time(est_tokens)
+            if wait > 0:
+                # 한도 리셋 시점에 다시 시도
+                self.counters["quota_waits"] += 1
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(wait, self._on_timer)
+                return
+            heapq.heappop(self._waiters)
+            self._take(bucket, est_tokens)
+            fut.set_result(None)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    # ---------- 호출 ----------
+
+    async def submit(self, fn: Callable[[], Awaitable[Any]], priority: int = PRIORITY_INTERACTIVE,
+                     bucket: str = "default", est_tokens: int = 0, max_wait: Optional[float] = None) -> Any:
+        """
+        fn 은 with_raw_response 호출 코루틴을 만드는 함수.
+        헤더로 한도를 갱신하고 파싱된 응답을 반환한다.
+        max_wait: 슬롯/한도를 기다릴 최대 시간 (초과하면 Overloaded, None 이면 무제한)
+        """
+        await self._acquire(priority, bucket, est_tokens, max_wait)
+        try:
+            attempt = 0
+            while True:
+                try:
+                    raw = await fn()
+                except Exception as e:
+                    if getattr(e, "status_code", None) != 429 or attempt >= self.max_retries:
+                        raise
+                    attempt += 1
+                    self.counters["rate_limited"] += 1
+                    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+                    state = self._limit(bucket)
+                    state.update(headers)
+                    state.on_rate_limited(parse_reset(headers.get("retry-after")))
+                    await asyncio.sleep(state.wait_time(est_tokens))
+                    continue
+                self._limit(bucket).update(raw.headers)
+                return raw.parse()
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": sum(1 for w in self._waiters if not w[2].done()),
+            **self.counters,
+            "limits": {
+                name: {"remaining_requests": s.remaining_requests, "remaining_tokens": s.remaining_tokens}
+                for name, s in self.limits.items()
+            },
+        }
+
+
+class EmbeddingBatcher:
+    """linger 시간 동안 들어온 임베딩 요청을 모아 한 번에 요청 (같은 텍스트는 1번만)"""
+
+    def __init__(self, create_batch: Callable[[List[str]], Awaitable[List[List[float]]]],
+                 linger: float = 0.005, max_batch: int = 64):
+        self.create_batch = create_batch
+        self.linger = linger
+        self.max_batch = max_batch
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.coalesced = 0
+
+    async def embed(self, text: str) -> List[float]:
+        fut = self._pending.get(text)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = self._pending[text] = loop.create_future()
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.linger, self._flush)
+        else:
+            self.coalesced += 1
+        # 한 호출자가 취소돼도 같은 배치를 기다리는 다른 호출자는 영향 없음
+        return await asyncio.shield(fut)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self.batches += 1
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: Dict[str, asyncio.Future]):
+        texts = list(batch)
+        try:
+            vectors = await self.create_batch(texts)
+        except Exception as e:
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+                    fut.exception()  # 기다리는 쪽이 없어도 경고 안 나게
+            return
+        for text, vec in zip(texts, vectors):
+            if not batch[text].done():
+                batch[text].set_result(vec)
+
+
+openai_scheduler = OutboundScheduler(
+    max_concurrency=config.OPENAI_MAX_CONCURRENCY,
+    max_queue=config.OPENAI_MAX_QUEUE,
+)
@@ -1,6 +1,13 @@
-from openai import AsyncOpenAI
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import hashlib
+import time
+import orjson
 from utils.config import config
+from services.resilience import Overloaded, is_upstream_failure, openai_chat, openai_embedding
+from services.model_router import model_router
+from services.openai_scheduler import (
+    openai_scheduler, EmbeddingBatcher, PRIORITY_INTERACTIVE, PRIORITY_SEARCH,
+)
 
 
 def _pick(store: Dict[str, Any], keys: List[str], default: str = "") -> Any:
@@ -18,31 +25,154 @@ def _fmt_price(p) -> str:
     except Exception:
         # 문자열 등은 그대로
         return str(p)
+
+def _estimate_tokens(texts: List[str]) -> int:
+    """대략적인 토큰 수 (한글 기준 1글자 ≈ 1토큰 이하로 보수적으로 계산)"""
+    return sum(len(t) for t in texts)
+
+
+def _queue_budget(timeout: float) -> float:
+    """스케줄러 대기에 쓸 시간 (기본 Upstream 타임아웃의 절반, 나머지는 실제 요청 몫)"""
+    return timeout * config.OPENAI_QUEUE_WAIT_RATIO
     
 
+def build_system_prompt(store_info: Dict[str, Any]) -> str:
+    """상점 정보로 상담원 시스템 프롬프트 생성 (키 안전/보정 버전)"""
+    # ---- 키 보정/안전 조회 ----
+    name        = _pick(store_info, ["name"], "가게")
+    persona     = _pick(store_info, ["persona"], f"상냥하고 도움이 되는 {name} 매장 직원")
+    industry    = _pick(store_info, ["industry"], "")
+    address     = _pick(store_info, ["address"], "")
+    phone       = _pick(store_info, ["phone"], "")
+    open_start  = _pick(store_info, ["opening_hour_start", "openingHourStart"], "")
+    open_end    = _pick(store_info, ["opening_hour_end", "openingHourEnd"], "")
+    strengths   = _pick(store_info, ["strengths"], "정보 없음")
+    parking     = _pick(store_info, ["parking_info", "parkingInfo"], "정보 없음")
+    sns         = _pick(store_info, ["sns_url", "snsUrl"], "정보 없음")
+
+    # 휴무일은 리스트/문자열 모두 처리
+    holidays_raw = _pick(store_info, ["holidays"], [])
+    if isinstance(holidays_raw, list):
+        holidays = ", ".join([str(h) for h in holidays_raw if str(h).strip() and str(h) != "[]"]) or "없음"
+    elif isinstance(holidays_raw, str):
+        holidays = holidays_raw if holidays_raw.strip() else "없음"
+    else:
+        holidays = "없음"
+
+    # 메뉴/서비스 보정
+    services = store_info.get("services") or []
+    lines = []
+    for s in services:
+        menu  = _pick(s, ["menu", "name"], "")
+        price = _pick(s, ["price", "amount"], "")
+        if menu:
+            price_txt = f": {_fmt_price(price)}원" if price not in ("", None) else ""
+            lines.append(f"- {menu}{price_txt}")
+    services_text = "\n".join(lines) if lines else "- (등록된 메뉴 정보가 없습니다)"
+
+    # ---- 프롬프트 구성 (기존 톤 최대한 유지) ----
+    system_prompt = f"""당신은 '{name}'의 친절한 챗봇 상담원입니다.
+{persona}에 맞게 답변해주어야 합니다.
+
+[상점 정보]
+- 상점명: {name}
+- 업종: {industry}
+- 주소: {address}
+- 전화번호: {phone}
+- 영업시간: {open_start} ~ {open_end}
+- 휴무일: {holidays}
+- 메뉴:
+{services_text}
+- 강점: {strengths}
+- 주차정보: {parking}
+- SNS: {sns}
+
+위 정보를 바탕으로 고객의 질문에 친절하고 정확하게 답변해주세요.
+정보가 없는 경우 솔직하게 알려주세요.
+"""
+    return system_prompt
+
+
 class OpenAIService:
+    # 프로세스 공용 HTTP 클라이언트 (라우터별 인스턴스가 커넥션 풀을 같이 씀)
+    _client = None
+    embedding_model = config.PINECONE_EMBEDDING_MODEL
+
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
         self.model = config.OPENAI_API_MODEL
-        self.embedding_model = config.PINECONE_EMBEDDING_MODEL
-    
+
+    @property
+    def client(self):
+        return OpenAIService._shared_client()
+
+    @classmethod
+    def _shared_client(cls):
+        # 첫 사용(또는 워밍업) 때 생성 → import 시 openai SDK 로드 안 함
+        if cls._client is None:
+            from openai import AsyncOpenAI  # 무거운 SDK 는 실제로 쓸 때 로드
+            # 429 재시도는 retry-after 를 보는 스케줄러가 담당 (SDK 자체 재시도 끔)
+            cls._client = AsyncOpenAI(api_key=config.OPENAI_API_KEY, base_url=config.OPENAI_BASE_URL,
+                                      max_retries=0)
+        return cls._client
+
+    def reconnect(self):
+        """fork 이후 워커에서 호출: HTTP 클라이언트는 다음 사용 때 새로 생성"""
+        OpenAIService._client = None
+
+    @classmethod
+    async def _create_embeddings(cls, texts: List[str], priority: int = PRIORITY_SEARCH) -> List[List[float]]:
+        """여러 텍스트를 한 번의 요청으로 임베딩 (스케줄러 경유)"""
+        response = await openai_scheduler.submit(
+            lambda: cls._shared_client().embeddings.with_raw_response.create(
+                model=cls.embedding_model,
+                input=texts
+            ),
+            priority=priority,
+            bucket=cls.embedding_model,
+            est_tokens=_estimate_tokens(texts),
+            max_wait=_queue_budget(openai_embedding.timeout),
+        )
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
     async def create_embedding(self, text: str) -> List[float]:
-        """텍스트를 임베딩 벡터로 변환"""
-        response = await self.client.embeddings.create(
-            model=self.embedding_model,
-            input=text
+        """텍스트를 임베딩 벡터로 변환 (동시 요청은 프로세스 전체에서 묶어서 처리)"""
+        return await openai_embedding.call(
+            lambda: embedding_batcher.embed(text),
+            cache_key=(self.embedding_model, text)
         )
-        return response.data[0].embedding
     
     async def chat_completion(self, messages: List[Dict[str, str]], 
-                             temperature: float = 0.7) -> str:
-        """GPT 채팅 완성"""
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature
-        )
-        return response.choices[0].message.content
+                             temperature: float = 0.7,
+                             task: str = "store_qa",
+                             latency_budget_ms: Optional[float] = None) -> str:
+        """GPT 채팅 완성 (작업 유형/지연 예산에 따라 모델 선택)"""
+        model, _ = model_router.choose(task, messages, latency_budget_ms)
+
+        async def _create():
+            started = time.perf_counter()
+            try:
+                response = await openai_scheduler.submit(
+                    lambda: self.client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature
+                    ),
+                    priority=PRIORITY_INTERACTIVE,
+                    bucket=model,
+                    est_tokens=_estimate_tokens([m.get("content") or "" for m in messages]),
+                    max_wait=_queue_budget(openai_chat.timeout),
+                )
+            except Exception as e:
+                # 우리 쪽 대기열 거절(Overloaded)·4xx 는 모델이 느리거나 불안정한 게 아니므로 제외
+                if is_upstream_failure(e) and not isinstance(e, Overloaded):
+                    model_router.record(model, started, ok=False)
+                raise
+            model_router.record(model, started, ok=True)
+            return response.choices[0].message.content
+
+        # 같은 대화 문맥이면 장애 시 최근 답변을 재사용
+        cache_key = (model, temperature, hashlib.sha1(orjson.dumps(messages)).hexdigest())
+        return await openai_chat.call(_create, cache_key=cache_key)
     
     # 사용자 질문과 매칭되는 상점 찾기(상점 스위칭)
     async def find_matching_store(self, user_query: str, 
@@ -68,7 +198,7 @@ class OpenAIService:
             {"role": "user", "content": prompt}
         ]
         
-        response = await self.chat_completion(messages, temperature=0.3)
+        response = await self.chat_completion(messages, temperature=0.3, task="store_match")
         
         try:
             index = int(response.strip()) - 1
@@ -87,60 +217,10 @@ class OpenAIService:
         user_message: str,
         chat_history: List[Dict[str, str]] = [],
     ) -> str:
-        """상점 정보를 바탕으로 사용자 질문에 답변 생성 (키 안전/보정 버전)"""
-
-        # ---- 키 보정/안전 조회 ----
-        name        = _pick(store_info, ["name"], "가게")
-        persona     = _pick(store_info, ["persona"], f"상냥하고 도움이 되는 {name} 매장 직원")
-        industry    = _pick(store_info, ["industry"], "")
-        address     = _pick(store_info, ["address"], "")
-        phone       = _pick(store_info, ["phone"], "")
-        open_start  = _pick(store_info, ["opening_hour_start", "openingHourStart"], "")
-        open_end    = _pick(store_info, ["opening_hour_end", "openingHourEnd"], "")
-        strengths   = _pick(store_info, ["strengths"], "정보 없음")
-        parking     = _pick(store_info, ["parking_info", "parkingInfo"], "정보 없음")
-        sns         = _pick(store_info, ["sns_url", "snsUrl"], "정보 없음")
-
-        # 휴무일은 리스트/문자열 모두 처리
-        holidays_raw = _pick(store_info, ["holidays"], [])
-        if isinstance(holidays_raw, list):
-            holidays = ", ".join([str(h) for h in holidays_raw if str(h).strip() and str(h) != "[]"]) or "없음"
-        elif isinstance(holidays_raw, str):
-            holidays = holidays_raw if holidays_raw.strip() else "없음"
-        else:
-            holidays = "없음"
-
-        # 메뉴/서비스 보정
-        services = store_info.get("services") or []
-        lines = []
-        for s in services:
-            menu  = _pick(s, ["menu", "name"], "")
-            price = _pick(s, ["price", "amount"], "")
-            if menu:
-                price_txt = f": {_fmt_price(price)}원" if price not in ("", None) else ""
-                lines.append(f"- {menu}{price_txt}")
-        services_text = "\n".join(lines) if lines else "- (등록된 메뉴 정보가 없습니다)"
-
-        # ---- 프롬프트 구성 (기존 톤 최대한 유지) ----
-        system_prompt = f"""당신은 '{name}'의 친절한 챗봇 상담원입니다.
-{persona}에 맞게 답변해주어야 합니다.
-
-[상점 정보]
-- 상점명: {name}
-- 업종: {industry}
-- 주소: {address}
-- 전화번호: {phone}
-- 영업시간: {open_start} ~ {open_end}
-- 휴무일: {holidays}
-- 메뉴:
-{services_text}
-- 강점: {strengths}
-- 주차정보: {parking}
-- SNS: {sns}
+        """상점 정보를 바탕으로 사용자 질문에 답변 생성"""
 
-위 정보를 바탕으로 고객의 질문에 친절하고 정확하게 답변해주세요.
-정보가 없는 경우 솔직하게 알려주세요.
-"""
+        # 상세보기 진입 시 미리 만들어 둔 프롬프트가 있으면 재사용
+        system_prompt = store_info.get("system_prompt") or build_system_prompt(store_info)
 
         messages = [{"role": "system", "content": system_prompt}]
         # 이전 대화 히스토리(있다면) 이어붙이기
@@ -149,4 +229,13 @@ class OpenAIService:
         # 이번 사용자 질문
         messages.append({"role": "user", "content": user_message or "안녕하세요. 무엇을 도와드릴까요?"})
 
-        return await self.chat_completion(messages)
\ No newline at end of file
+        task = model_router.classify_question(user_message)
+        return await self.chat_completion(messages, task=task)
+
+
+# 프로세스 공용 임베딩 배처 (라우터가 달라도 같은 배치로 묶임)
+embedding_batcher = EmbeddingBatcher(
+    OpenAIService._create_embeddings,
+    linger=config.OPENAI_EMBED_LINGER_MS / 1000,
+    max_batch=config.OPENAI_EMBED_MAX_BATCH,
+)
@@ -1,47 +1,92 @@
 # pinecone_service.py
 
-from pinecone import Pinecone, ServerlessSpec
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 import json
+import asyncio
+import threading
 from utils.config import config
 from services.openai_service import OpenAIService
+from services.resilience import UpstreamUnavailable, pinecone_query
 import math
 
+# SDK 는 처음 연결할 때 한 번만 import (여러 스레드가 동시에 import 하면 부분 초기화된 모듈을 보게 됨)
+_sdk_lock = threading.Lock()
+_sdk = None
+
+
+def _pinecone_sdk():
+    global _sdk
+    with _sdk_lock:
+        if _sdk is None:
+            from pinecone import Pinecone, ServerlessSpec  # 무거운 SDK 는 실제로 쓸 때 로드
+            _sdk = (Pinecone, ServerlessSpec)
+    return _sdk
+
+
 class PineconeService:
     def __init__(self):
-        # Pinecone 초기화 (최신 버전 방식)
-        self.pc = Pinecone(api_key=config.PINECONE_API_KEY)
-        
+        # 네트워크 호출 없이 생성만 (연결은 connect() 또는 첫 사용 때)
+        self.pc = None
+        self._index = None
+        self._lock = threading.Lock()
         self.index_name = config.PINECONE_INDEX
         self.openai_service = OpenAIService()
-        
-        # 인덱스가 존재하는지 확인
-        existing_indexes = [index.name for index in self.pc.list_indexes()]
-        
-        if self.index_name not in existing_indexes:
-            # 인덱스 생성 (Serverless 방식)
-            self.pc.create_index(
-                name=self.index_name,
-                dimension=1536,  # text-embedding-3-small 차원
-                metric='cosine',
-                spec=ServerlessSpec(
-                    cloud='aws',
-                    region=config.PINECONE_REGION
+
+    @property
+    def index(self):
+        if self._index is None:
+            self.connect()
+        return self._index
+
+    def connect(self):
+        """Pinecone 연결 + 인덱스 확인/생성 (동기, 워밍업에서 스레드로 호출)"""
+        with self._lock:
+            if self._index is not None:
+                return
+            Pinecone, ServerlessSpec = _pinecone_sdk()
+
+            self.pc = Pinecone(api_key=config.PINECONE_API_KEY)
+
+            # 인덱스가 존재하는지 확인 (host 를 알면 컨트롤 플레인 조회 생략)
+            existing_indexes = [] if config.PINECONE_INDEX_URL else [index.name for index in self.pc.list_indexes()]
+
+            if not config.PINECONE_INDEX_URL and self.index_name not in existing_indexes:
+                # 인덱스 생성 (Serverless 방식)
+                self.pc.create_index(
+                    name=self.index_name,
+                    dimension=1536,  # text-embedding-3-small 차원
+                    metric='cosine',
+                    spec=ServerlessSpec(
+                        cloud='aws',
+                        region=config.PINECONE_REGION
+                    )
                 )
-            )
-        
-        self.index = self.pc.Index(self.index_name)
 
-        # 인덱스 정보 출력
+            self._index = self._open_index()
+
+    def warm_up(self) -> Dict[str, Any]:
+        """연결 후 통계 조회 + 1건 쿼리로 커넥션 풀 준비 (동기)"""
         index_info = self.index.describe_index_stats()
-        print(f"\n{'='*80}")
-        print(f"Pinecone Index '{self.index_name}' initialized")
-        print(f"{'='*80}")
-        print(f"Total vectors: {index_info['total_vector_count']}")
-        print(f"Dimension: {index_info.get('dimension', 1536)}")
-        print(f"{'='*80}\n")
+        self.index.query(vector=[0.0] * 1536, top_k=1, include_metadata=False)
+        if config.PINECONE_DEBUG_SAMPLE:
+            self.debug_print_all_vectors()
+        return {"index": self.index_name, "total_vectors": index_info['total_vector_count']}
 
-        self.debug_print_all_vectors()
+    def _index_call(self, method: str, **kwargs):
+        """워커 스레드에서 실행: 인덱스 핸들 조회(첫 사용 시 연결)도 이벤트 루프 밖에서"""
+        return getattr(self.index, method)(**kwargs)
+
+    def reconnect(self):
+        """fork 이후 워커에서 호출: 마스터의 커넥션 풀을 공유하지 않도록 다음 사용 때 새로 연결"""
+        with self._lock:
+            self.pc = None
+            self._index = None
+        self.openai_service.reconnect()
+
+    def _open_index(self):
+        if config.PINECONE_INDEX_URL:
+            return self.pc.Index(host=config.PINECONE_INDEX_URL)
+        return self.pc.Index(self.index_name)
 
     # ==================== 메타데이터 파싱 유틸리티 ====================
     
@@ -73,6 +118,54 @@ class PineconeService:
         
         return parsed
     
+    def build_store(self, store_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Pinecone 메타데이터를 API 에서 쓰는 상점 dict 로 변환 (카탈로그 적재용)
+        """
+        parsed_store = self.parse_metadata(metadata)
+        store = {
+            'id': store_id,
+            'surveyId': parsed_store.get('surveyId', parsed_store.get('survey_id', store_id)),
+            'name': parsed_store.get('name', ''),
+            'industry': parsed_store.get('industry', ''),
+            'address': parsed_store.get('address', ''),
+            'phone': parsed_store.get('phone', ''),
+            'openingHourStart': parsed_store.get('openingHourStart', ''),
+            'openingHourEnd': parsed_store.get('openingHourEnd', ''),
+            'holidays': parsed_store.get('holidays', []),
+            'services': parsed_store.get('services', []),
+            'strengths': parsed_store.get('strengths', ''),
+            'parkingInfo': parsed_store.get('parkingInfo', ''),
+            'snsUrl': parsed_store.get('snsUrl', ''),
+        }
+        if 'latitude' in metadata and 'longitude' in metadata:
+            store['latitude'] = float(metadata['latitude'])
+            store['longitude'] = float(metadata['longitude'])
+        return store
+
+    def iter_all_stores(self, batch_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        인덱스의 모든 상점을 순회 (동기, 이벤트 루프 밖에서만 사용)
+        """
+        for ids in self.index.list():
+            for i in range(0, len(ids), batch_size):
+                chunk = ids[i:i + batch_size]
+                # pinecone 7.x 의 fetch 는 FetchResponse 데이터클래스 (첨자 접근 불가)
+                result = self.index.fetch(ids=chunk)
+                for store_id in chunk:
+                    vec = result.vectors.get(store_id)
+                    if vec is None:
+                        continue
+                    yield self.build_store(store_id, vec.metadata or {})
+
+    async def update_store_location(self, store_id: str, latitude: float, longitude: float):
+        """상점 메타데이터에 좌표 기록 (위치 검색 대상이 되도록)"""
+        await asyncio.to_thread(
+            self._index_call, "update",
+            id=store_id,
+            set_metadata={'latitude': latitude, 'longitude': longitude}
+        )
+
     def print_store_data(self, store_data: Dict[str, Any], title: str = "Store Data"):
         """
         상점 데이터를 콘솔에 예쁘게 출력
@@ -122,10 +215,15 @@ class PineconeService:
             
             # 검색
             print(f"Searching in Pinecone...")
-            results = self.index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                include_metadata=True
+            # 동기 SDK 호출은 스레드로 넘겨 이벤트 루프를 막지 않음
+            results = await pinecone_query.call(
+                lambda: asyncio.to_thread(
+                    self._index_call, "query",
+                    vector=query_embedding,
+                    top_k=top_k,
+                    include_metadata=True
+                ),
+                cache_key=("text", query, top_k)
             )
             
             print(f"Found {len(results['matches'])} results\n")
@@ -137,11 +235,13 @@ class PineconeService:
                 # 메타데이터 파싱
                 parsed_store = self.parse_metadata(metadata)
                 
-                # 콘솔에 출력
-                print(f"Result #{i} (Score: {match['score']:.4f})")
-                self.print_store_data(parsed_store)
+                # 콘솔에 출력 (결과마다 15줄 이상이라 디버그 때만)
+                if config.PINECONE_DEBUG_RESULTS:
+                    print(f"Result #{i} (Score: {match['score']:.4f})")
+                    self.print_store_data(parsed_store)
                 
                 store = {
+                    'id': match['id'],
                     'surveyId': parsed_store.get('surveyId', parsed_store.get('survey_id', '')),
                     'name': parsed_store.get('name', ''),
                     'industry': parsed_store.get('industry', ''),
@@ -162,6 +262,9 @@ class PineconeService:
             print(f"{'='*80}\n")
             return stores
             
+        except UpstreamUnavailable:
+            # 장애는 "결과 없음" 과 구분해서 라우터가 안내하도록 그대로 전달
+            raise
         except Exception as e:
             print(f"\nError searching stores: {e}")
             import traceback
@@ -177,21 +280,27 @@ class PineconeService:
             print(f"Survey ID: {survey_id}\n")
             
             # Pinecone에서 fetch
-            result = self.index.fetch(ids=[survey_id])
+            result = await pinecone_query.call(
+                lambda: asyncio.to_thread(self._index_call, "fetch", ids=[survey_id]),
+                cache_key=("fetch", survey_id)
+            )
             
-            if survey_id not in result['vectors']:
+            vec = result.vectors.get(survey_id)
+            if vec is None:
                 print(f"Store not found: {survey_id}\n")
                 return None
             
-            metadata = result['vectors'][survey_id]['metadata']
+            metadata = vec.metadata or {}
             
             # 메타데이터 파싱
             parsed_store = self.parse_metadata(metadata)
             
-            # 콘솔에 출력
-            self.print_store_data(parsed_store, f"Store Details: {parsed_store.get('name', 'Unknown')}")
+            # 콘솔에 출력 (디버그 때만)
+            if config.PINECONE_DEBUG_RESULTS:
+                self.print_store_data(parsed_store, f"Store Details: {parsed_store.get('name', 'Unknown')}")
             
             store = {
+                'id': survey_id,
                 'surveyId': parsed_store.get('surveyId', parsed_store.get('survey_id', '')),
                 'name': parsed_store.get('name', ''),
                 'industry': parsed_store.get('industry', ''),
@@ -239,10 +348,14 @@ class PineconeService:
             
             # Pinecone 메타데이터 필터로 검색
             # 먼저 더 많은 결과를 가져온 후 거리로 필터링
-            results = self.index.query(
-                vector=[0.0] * 1536,  # 더미 벡터 (메타데이터만 사용)
-                top_k=100,  # 충분히 많이 가져오기
-                include_metadata=True
+            results = await pinecone_query.call(
+                lambda: asyncio.to_thread(
+                    self._index_call, "query",
+                    vector=[0.0] * 1536,  # 더미 벡터 (메타데이터만 사용)
+                    top_k=100,  # 충분히 많이 가져오기
+                    include_metadata=True
+                ),
+                cache_key=("location_scan", 100)
             )
             
             stores_with_distance = []
@@ -265,6 +378,7 @@ class PineconeService:
                     parsed_store = self.parse_metadata(metadata)
                     
                     store = {
+                        'id': match['id'],
                         'surveyId': parsed_store.get('surveyId', parsed_store.get('survey_id', '')),
                         'name': parsed_store.get('name', ''),
                         'industry': parsed_store.get('industry', ''),
@@ -292,14 +406,18 @@ class PineconeService:
             
             print(f"Found {len(result_stores)} stores within {radius_km}km\n")
             
-            # 결과 출력
-            for i, store in enumerate(result_stores, 1):
-                print(f"Result #{i} (Distance: {store['distance']}km)")
-                self.print_store_data(store)
+            # 결과 출력 (디버그 때만)
+            if config.PINECONE_DEBUG_RESULTS:
+                for i, store in enumerate(result_stores, 1):
+                    print(f"Result #{i} (Distance: {store['distance']}km)")
+                    self.print_store_data(store)
             
             print(f"{'='*80}\n")
             return result_stores
             
+        except UpstreamUnavailable:
+            # 장애는 "결과 없음" 과 구분해서 라우터가 안내하도록 그대로 전달
+            raise
         except Exception as e:
             print(f"\nError searching stores by location: {e}")
             import traceback
@@ -0,0 +1,176 @@
+# profiler.py
+#
+# 운영 중 지연 원인 진단 도구
+#  - LoopLagMonitor : 이벤트 루프 지연 상시 측정. 루프가 N ms 이상 막히면
+#                     감시 스레드가 그 순간 루프 스레드의 스택을 잡아 로그로 남긴다.
+#  - sample_stacks  : 지정 시간 동안 루프 스레드 스택 샘플링 → flamegraph 용 folded 포맷
+#  - RequestProfiler: 다음 N개 요청 동안 cProfile 수집 → .prof (pstats) 파일
+#                     (RequestProfilerMiddleware 는 순수 ASGI, 평소에는 그대로 통과)
+
+import asyncio
+import cProfile
+import marshal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+from utils.config import config
+
+
+def _folded(frame) -> str:
+    """프레임 → 'file:func;file:func' (바깥 → 안쪽)"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.1, threshold_ms: float = 200.0, keep: int = 50):
+        self.interval = interval
+        self.threshold = threshold_ms / 1000
+        self.stalls: deque = deque(maxlen=keep)
+        self.max_lag_ms = 0.0
+        self.last_lag_ms = 0.0
+        self.stall_count = 0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._task = asyncio.ensure_future(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self.last_lag_ms = lag * 1000
+            self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+
+    def _watch(self):
+        # 루프가 막힌 동안에는 _tick 이 못 돌기 때문에 별도 스레드에서 감시
+        reported_for = 0.0
+        while not self._stop.wait(self.interval / 2):
+            beat = self._heartbeat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or beat == reported_for:
+                continue
+            reported_for = beat  # 같은 정지는 한 번만 기록
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame)[-8:] if frame is not None else []
+            self.stall_count += 1
+            self.stalls.append({
+                "at": time.time(),
+                "blocked_ms": round(blocked * 1000, 1),  # 감지 시점까지 막힌 시간 (전체는 max_lag_ms)
+                "stack": [line.strip() for line in stack],
+            })
+            print(f"[LOOP-LAG] event loop blocked {blocked * 1000:.0f}ms at:\n{''.join(stack)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "last_lag_ms": round(self.last_lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "stall_count": self.stall_count,
+            "threshold_ms": self.threshold * 1000,
+            "recent_stalls": list(self.stalls)[-10:],
+        }
+
+
+def _sample(thread_id: int, seconds: float, interval: float) -> Counter:
+    counts: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            counts[_folded(frame)] += 1
+        time.sleep(interval)
+    return counts
+
+
+async def sample_stacks(seconds: float = 10.0, interval: float = 0.005) -> str:
+    """이벤트 루프 스레드를 샘플링해 folded stack 텍스트 반환 (flamegraph.pl / speedscope 호환)"""
+    loop_thread_id = threading.get_ident()
+    counts = await asyncio.to_thread(_sample, loop_thread_id, seconds, interval)
+    return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+
+
+class RequestProfiler:
+    """다음 N개 요청 동안 cProfile 수집"""
+
+    def __init__(self):
+        self._profile: Optional[cProfile.Profile] = None
+        self._remaining = 0
+        self._active = 0
+        self.result: Optional[bytes] = None
+        self.result_requests = 0
+
+    @property
+    def armed(self) -> bool:
+        return self._remaining > 0 or self._active > 0
+
+    def arm(self, requests: int):
+        if self.armed:
+            raise RuntimeError("profiling already in progress")
+        self._remaining = requests
+        self.result = None
+
+    async def profile(self, app, scope, receive, send):
+        self._remaining -= 1
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            self.result_requests = 0
+        self._active += 1
+        try:
+            await app(scope, receive, send)
+        finally:
+            self._active -= 1
+            self.result_requests += 1
+            if self._remaining <= 0 and self._active == 0:
+                self._finish()
+
+    def _finish(self):
+        self._profile.disable()
+        self._profile.create_stats()
+        # pstats 파일 포맷 (snakeviz, flameprof, gprof2dot 등에서 열 수 있음)
+        self.result = marshal.dumps(self._profile.stats)
+        self._profile = None
+        print(f"[PROFILE] cProfile captured for {self.result_requests} requests")
+
+
+class RequestProfilerMiddleware:
+    """ASGI 미들웨어: 수집 중이 아니면 카운터 하나만 보고 그대로 통과"""
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if self.profiler._remaining <= 0 or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        return await self.profiler.profile(self.app, scope, receive, send)
+
+
+loop_monitor = LoopLagMonitor(threshold_ms=config.LOOP_LAG_THRESHOLD_MS)
+request_profiler = RequestProfiler()
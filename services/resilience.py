@@ -0,0 +1,298 @@
+# resilience.py
+#
+# 외부 의존성(OpenAI, Pinecone, 카카오 로컬) 호출 공통 보호막
+#  - 의존성별 타임아웃
+#  - 서킷 브레이커 (연속 실패 시 일정 시간 호출 차단)
+#  - 헤지 요청 (p95 를 넘기면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용)
+#    단, 호출의 HEDGE_RATIO 이내로만, 브레이커가 닫혀 있고 최근 실패율이 낮을 때만 (느려진 의존성에 부하 2배 방지)
+#  - 장애 시 최근 성공 결과(stale cache) 반환
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+import httpx
+
+from utils.config import config
+
+T = TypeVar("T")
+
+
+class UpstreamUnavailable(Exception):
+    """호출 실패 + 대체할 캐시 결과도 없음"""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"{name} unavailable: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+# SDK 연결 오류 (openai / pinecone(urllib3)) — SDK 를 import 하지 않도록 클래스 이름으로 판별
+_TRANSPORT_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "MaxRetryError",
+                          "NewConnectionError", "ProtocolError", "ReadTimeoutError"}
+
+
+def _status_of(e: BaseException) -> Optional[int]:
+    for obj in (e, getattr(e, "response", None)):
+        for attr in ("status_code", "status"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def is_upstream_failure(e: BaseException) -> bool:
+    """브레이커에 실패로 셀 예외인지: 타임아웃, 연결 오류, 429, 5xx 만 (4xx·코드 오류는 아님)"""
+    if isinstance(e, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    status = _status_of(e)
+    if status is not None:
+        return status == 429 or status >= 500
+    return any(cls.__name__ in _TRANSPORT_ERROR_NAMES for cls in type(e).__mro__)
+
+
+class Overloaded(UpstreamUnavailable):
+    """우리 쪽 대기열이 가득 차 보내지도 않은 요청 (업스트림 장애가 아니므로 브레이커에 반영 안 함)"""
+
+
+class CircuitBreaker:
+    """closed → (연속 실패) → open → (reset_timeout 경과) → half_open → 성공 시 closed"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._probing = False
+        # half_open: 시험 요청 1개만 통과
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def release(self):
+        """시험 요청이 취소된 경우 다음 요청이 다시 시험할 수 있게 함"""
+        self._probing = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """최근 N개 응답시간으로 백분위 계산"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples: deque = deque(maxlen=size)
+        self.min_samples = min_samples
+        self._cached: Dict[float, float] = {}
+        self._dirty = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self._dirty += 1
+        # 매 호출마다 정렬하지 않도록 일정 개수마다 갱신
+        if self._dirty >= 10:
+            self._cached.clear()
+            self._dirty = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        if q not in self._cached:
+            ordered = sorted(self.samples)
+            self._cached[q] = ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+        return self._cached[q]
+
+
+class HedgeBudget:
+    """헤지 요청 상한 (토큰 버킷): 호출마다 ratio 만큼 적립, 헤지 1번에 1개 사용"""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = 0.0
+
+    def on_call(self):
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class StaleCache:
+    """최근 성공 결과 보관 (LRU + 최대 보관시간)"""
+
+    def __init__(self, max_size: int = 1000, max_age: float = 600.0):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def put(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[tuple]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if time.monotonic() - item[0] > self.max_age:
+            del self._data[key]
+            return None
+        return item
+
+
+class Upstream:
+    """외부 의존성 1개에 대한 보호 호출기"""
+
+    def __init__(self, name: str, timeout: float, hedge: bool = False,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 stale_max_age: float = 600.0, cache_size: int = 1000):
+        self.name = name
+        self.timeout = timeout
+        self.hedge = hedge
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyTracker()
+        self.cache = StaleCache(cache_size, stale_max_age)
+        self.hedge_budget = HedgeBudget(config.HEDGE_RATIO, config.HEDGE_BURST)
+        self.outcomes: deque = deque(maxlen=50)  # 최근 호출 실패 여부 (헤지 허용 판단용)
+        self.calls = 0
+        self.errors = 0
+        self.hedged = 0
+        self.hedge_skipped = 0
+        self.stale_served = 0
+        self.rejected = 0
+
+    async def call(self, fn: Callable[[], Awaitable[T]], cache_key: Optional[Hashable] = None) -> T:
+        """
+        fn 은 호출할 때마다 새 코루틴을 만드는 함수 (헤지 시 두 번 호출될 수 있음)
+        cache_key 를 주면 성공 결과를 보관했다가 장애 시 대신 반환
+        """
+        self.calls += 1
+        if not self.breaker.allow():
+            self.rejected += 1
+            return self._fallback(cache_key, "circuit open")
+
+        self.hedge_budget.on_call()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._attempt(fn), self.timeout)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Overloaded as e:
+            # 업스트림은 정상 → 실패로 세지 않고 시험 요청 자리만 반납
+            self.breaker.release()
+            self.rejected += 1
+            return self._fallback(cache_key, e.reason)
+        except Exception as e:
+            if not is_upstream_failure(e):
+                # 잘못된 요청(4xx)·코드 오류는 업스트림 장애가 아님 → 그대로 전달
+                self.breaker.release()
+                raise
+            self.errors += 1
+            self.outcomes.append(True)
+            self.breaker.record_failure()
+            print(f"[RESILIENCE] {self.name} failed: {e!r} (breaker={self.breaker.state})")
+            return self._fallback(cache_key, repr(e))
+
+        self.breaker.record_success()
+        self.outcomes.append(False)
+        self.latency.add(time.perf_counter() - started)
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]]) -> T:
+        delay = self.latency.percentile(0.95) if self.hedge else None
+        if delay is None:
+            return await fn()
+
+        first = asyncio.ensure_future(fn())
+        second = None
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done:
+                return first.result()
+            if not self._may_hedge():
+                self.hedge_skipped += 1
+                return await first
+
+            # p95 초과 → 두 번째 요청을 보내고 먼저 성공한 쪽 사용
+            self.hedged += 1
+            second = asyncio.ensure_future(fn())
+            pending = {first, second}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # 타임아웃/취소 시 남은 요청 정리
+            for task in (first, second):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def _may_hedge(self) -> bool:
+        """브레이커가 닫혀 있고, 최근 실패율이 낮고, 헤지 예산이 남았을 때만"""
+        if self.breaker.state != "closed":
+            return False
+        if len(self.outcomes) >= 10 and sum(self.outcomes) / len(self.outcomes) > config.HEDGE_MAX_ERROR_RATE:
+            return False
+        return self.hedge_budget.try_spend()
+
+    def _fallback(self, cache_key: Optional[Hashable], reason: str) -> Any:
+        item = self.cache.get(cache_key) if cache_key is not None else None
+        if item is None:
+            raise UpstreamUnavailable(self.name, reason)
+        self.stale_served += 1
+        print(f"[RESILIENCE] {self.name}: serving cached result ({time.monotonic() - item[0]:.0f}s old)")
+        return item[1]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "hedged": self.hedged,
+            "hedge_skipped": self.hedge_skipped,
+            "stale_served": self.stale_served,
+            "p95_ms": round((self.latency.percentile(0.95) or 0) * 1000, 1),
+        }
+
+
+# 의존성별 인스턴스 (서비스 객체가 여러 개여도 상태는 공유)
+openai_chat = Upstream("openai_chat", timeout=config.OPENAI_CHAT_TIMEOUT, hedge=False)
+openai_embedding = Upstream("openai_embedding", timeout=config.OPENAI_EMBEDDING_TIMEOUT, hedge=config.HEDGE_ENABLED)
+pinecone_query = Upstream("pinecone", timeout=config.PINECONE_TIMEOUT, hedge=config.HEDGE_ENABLED, cache_size=200)
+kakao_local = Upstream("kakao_local", timeout=config.KAKAO_LOCAL_TIMEOUT, hedge=config.HEDGE_ENABLED, stale_max_age=86400.0)
+
+upstreams = {u.name: u for u in (openai_chat, openai_embedding, pinecone_query, kakao_local)}
@@ -0,0 +1,103 @@
+# result_pager.py
+#
+# 추천 결과 "더보기" 페이지 처리
+#  - 추천 시 깊게(RECOMMEND_DEPTH) 한 번만 검색하고, 세션에는 (store_id, 점수) 목록 + 커서만 저장
+#  - 더보기는 세션의 순위 목록에서 다음 페이지를 잘라 카탈로그/후보 캐시로 카드 생성 (외부 호출 없음)
+#  - 카탈로그에 없는 상점(원격 샤드, Pinecone 검색 결과)은 프로세스 공용 LRU 에 한 벌만 보관
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.catalog_service import catalog
+from utils.config import config
+
+MORE_UTTERANCE = "더보기"
+
+Ranked = List[Tuple[str, float]]
+
+
+class ResultPager:
+    def __init__(self, page_size: int = 5, depth: int = 30, cache_size: int = 5000):
+        self.page_size = page_size
+        self.depth = depth
+        self.cache_size = cache_size
+        self._candidates: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.counters = {"searches": 0, "pages": 0, "missing": 0}
+
+    @staticmethod
+    def wants_more(utterance: str, client_extra: Dict[str, Any]) -> bool:
+        return utterance == MORE_UTTERANCE or "cursor" in client_extra
+
+    @staticmethod
+    def parse_cursor(client_extra: Dict[str, Any]) -> Optional[int]:
+        try:
+            return int(client_extra["cursor"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def carry(session: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """상세보기 등 다른 모드로 세션을 바꿀 때 이어 갈 순위 목록/커서 (없으면 빈 dict)"""
+        if not session or "ranked" not in session:
+            return {}
+        return {"ranked": session["ranked"], "cursor": session.get("cursor", 0)}
+
+    def dedup_cursor(self, session: Optional[Dict[str, Any]], utterance: str,
+                     client_extra: Dict[str, Any]) -> Optional[int]:
+        """
+        중복 요청 키에 넣을 세션 커서.
+        메시지형 "더보기" 는 extra 에 커서가 없어 연타가 같은 키가 되므로 세션 커서로 구분.
+        """
+        if not session or not self.wants_more(utterance, client_extra):
+            return None
+        return session.get("cursor")
+
+    def start(self, stores: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[int]]:
+        """
+        검색 결과 전체로 세션용 순위 목록 생성.
+        반환: (세션에 넣을 값, 첫 페이지 상점, 다음 커서 또는 None)
+        """
+        self.counters["searches"] += 1
+        ranked: Ranked = []
+        for s in stores:
+            store_id = s.get('id')
+            if not store_id:
+                continue
+            # 위치 검색은 거리, 텍스트 검색은 유사도
+            score = s.get('distance') if s.get('distance') is not None else s.get('score', 0.0)
+            ranked.append((store_id, float(score or 0.0)))
+            if catalog.get(store_id) is None:
+                self._remember(store_id, s)
+        first = stores[:self.page_size]
+        next_cursor = self.page_size if len(ranked) > self.page_size else None
+        return {"ranked": ranked, "cursor": self.page_size}, first, next_cursor
+
+    def page(self, state: Dict[str, Any], cursor: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """cursor(없으면 세션 커서)부터 한 페이지. 반환: (상점 목록, 다음 커서 또는 None)"""
+        ranked: Ranked = state.get("ranked") or []
+        start = state.get("cursor", 0) if cursor is None else max(0, cursor)
+        stores, pos = [], start
+        while pos < len(ranked) and len(stores) < self.page_size:
+            store_id, score = ranked[pos]
+            pos += 1
+            store = catalog.get(store_id) or self._candidates.get(store_id)
+            if store is None:
+                # 후보 캐시에서 밀려난 상점은 건너뜀
+                self.counters["missing"] += 1
+                continue
+            stores.append(store)
+        self.counters["pages"] += 1
+        state["cursor"] = pos
+        return stores, (pos if pos < len(ranked) else None)
+
+    def _remember(self, store_id: str, store: Dict[str, Any]):
+        self._candidates[store_id] = store
+        self._candidates.move_to_end(store_id)
+        while len(self._candidates) > self.cache_size:
+            self._candidates.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"candidates_cached": len(self._candidates), **self.counters}
+
+
+result_pager = ResultPager(config.RECOMMEND_PAGE_SIZE, config.RECOMMEND_DEPTH, config.RECOMMEND_CANDIDATE_CACHE)
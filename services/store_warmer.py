@@ -0,0 +1,80 @@
+# store_warmer.py
+#
+# 추천 캐러셀을 보여줄 때 카드의 상점들을 미리 준비해 두는 캐시.
+# "상세보기" 클릭 시 /kakao/store 는 store_id 로 메모리에서 바로 꺼내 쓴다.
+#   1) 전체 상점 정보 보강 (카탈로그에 있으면 카탈로그, 없으면 검색 결과 그대로 사용)
+#      검색 결과에 상세보기에 필요한 필드가 이미 있으므로 Pinecone 을 다시 조회하지 않는다
+#   2) 상담원 시스템 프롬프트 미리 렌더링
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from services.catalog_service import catalog
+from services.openai_service import build_system_prompt
+
+
+class StoreWarmer:
+    def __init__(self, ttl: float = 600.0, max_size: int = 2000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # store_id -> (만료시각, store)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def schedule(self, stores: List[Dict[str, Any]]):
+        """캐러셀 상점들을 백그라운드로 준비 (응답은 기다리지 않음)"""
+        now = time.monotonic()
+        for s in stores:
+            store_id = s.get('id')
+            if not store_id or store_id in self._inflight:
+                continue
+            entry = self._entries.get(store_id)
+            if entry and entry[0] > now:
+                continue
+            task = asyncio.ensure_future(self._warm(store_id, s))
+            self._inflight[store_id] = task
+            task.add_done_callback(lambda _t, sid=store_id: self._inflight.pop(sid, None))
+
+    async def _warm(self, store_id: str, store: Dict[str, Any]) -> Dict[str, Any]:
+        full = catalog.get(store_id)
+        # 검색 결과(거리/점수 등) 위에 전체 정보를 덮어씀
+        warmed = {**store, **(full or {}), 'id': store_id}
+        warmed['system_prompt'] = build_system_prompt(warmed)
+        self._put(store_id, warmed)
+        return warmed
+
+    def _put(self, store_id: str, store: Dict[str, Any]):
+        self._entries[store_id] = (time.monotonic() + self.ttl, store)
+        self._entries.move_to_end(store_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, store_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """준비된 상점 반환 (준비 중이면 그 결과를 기다림)"""
+        if not store_id:
+            return None
+        entry = self._entries.get(store_id)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        task = self._inflight.get(store_id)
+        if task is not None:
+            self.hits += 1
+            return await asyncio.shield(task)
+        self.misses += 1
+        full = catalog.get(store_id)
+        if full is not None:
+            warmed = {**full, 'system_prompt': build_system_prompt(full)}
+            self._put(store_id, warmed)
+            return warmed
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "inflight": len(self._inflight),
+                "hits": self.hits, "misses": self.misses}
+
+
+store_warmer = StoreWarmer()
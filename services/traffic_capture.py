@@ -0,0 +1,98 @@
+# traffic_capture.py
+#
+# 운영 트래픽 샘플 수집 (CAPTURE_ENABLED=true 일 때만)
+#  - /kakao/* POST 요청 바디를 그대로 가로채 큐에 넣기만 함 (요청 경로에서 파싱/파일 I/O 없음)
+#  - 샘플링은 사용자 단위 (같은 사용자의 추천 → 상세보기 흐름이 통째로 남도록)
+#  - 기록 스레드에서 사용자 ID 해시, 개인정보 필드 제거 후 gzip JSONL 로 저장
+#
+# 재생: python -m scripts.replay_traffic captures/ --target http://localhost:8000
+
+import hashlib
+import hmac
+import re
+import secrets
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from services.log_writer import BufferedJsonlWriter
+
+_DIGITS_RE = re.compile(r"\d[\d\- ]{7,}\d")  # 전화번호/계좌번호 등 긴 숫자열
+
+
+def mask_digits(value: Any) -> Any:
+    """문자열 안의 긴 숫자열(전화번호 등)을 <num> 으로 치환"""
+    if isinstance(value, str):
+        return _DIGITS_RE.sub("<num>", value)
+    return value
+
+
+class TrafficCapture:
+    def __init__(self, directory: str, sample_rate: float, salt: str, path_prefix: str = "/kakao/"):
+        self.sample_rate = sample_rate
+        if not salt:
+            # 워커마다 키가 달라지면 같은 사용자의 흐름이 끊기므로 CAPTURE_SALT 설정 권장
+            print("[CAPTURE] CAPTURE_SALT not set, using a random per-process key")
+            salt = secrets.token_hex(16)
+        self.salt = salt.encode()
+        self.path_prefix = path_prefix
+        self.writer = BufferedJsonlWriter(directory, "capture", transform=self._to_record)
+
+    def _hash(self, value: str) -> str:
+        return hmac.new(self.salt, value.encode(), hashlib.sha256).hexdigest()[:24]
+
+    def _sampled(self, user_id: str) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        bucket = int(hashlib.blake2b(user_id.encode(), digest_size=4).hexdigest(), 16) % 10000
+        return bucket < self.sample_rate * 10000
+
+    def anonymize(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        user_request = body.get("userRequest") or {}
+        user = user_request.get("user") or {}
+        if user.get("id"):
+            user["id"] = self._hash(user["id"])
+        user.pop("properties", None)  # plusfriendUserKey, appUserId 등
+        if "utterance" in user_request:
+            user_request["utterance"] = mask_digits(user_request["utterance"])
+        action = body.get("action") or {}
+        for key in ("params", "clientExtra"):
+            if isinstance(action.get(key), dict):
+                action[key] = {k: mask_digits(v) for k, v in action[key].items()}
+        action.pop("detailParams", None)  # params 와 중복
+        return body
+
+    def _to_record(self, item: Tuple[float, str, bytes]) -> Optional[Dict[str, Any]]:
+        ts, path, raw = item
+        body = orjson.loads(raw)
+        user_id = ((body.get("userRequest") or {}).get("user") or {}).get("id") or ""
+        if not self._sampled(user_id):
+            return None
+        return {"ts": ts, "path": path, "body": self.anonymize(body)}
+
+
+class TrafficCaptureMiddleware:
+    """ASGI 미들웨어: 요청 바디를 흘려보내면서 복사본만 큐에 넣음"""
+
+    def __init__(self, app, capture: TrafficCapture):
+        self.app = app
+        self.capture = capture
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" \
+                or not scope["path"].startswith(self.capture.path_prefix):
+            return await self.app(scope, receive, send)
+
+        ts = time.time()
+        chunks = []
+
+        async def tee_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    self.capture.writer.write((ts, scope["path"], b"".join(chunks)))
+            return message
+
+        return await self.app(scope, tee_receive, send)
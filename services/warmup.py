@@ -0,0 +1,87 @@
+# warmup.py
+#
+# 워커 시작 시 준비 작업을 동시에 실행하고 준비 상태(/kakao/ready)를 관리
+#  - 단계마다 소요 시간/결과 기록
+#  - required 단계가 실패하면 준비 안 됨 → 백그라운드에서 재시도
+#  - 선택 단계(optional)는 실패해도 준비 완료로 봄 (첫 요청이 조금 느릴 뿐)
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class WarmupStep:
+    def __init__(self, name: str, fn: Callable[[], Awaitable[Any]], required: bool):
+        self.name = name
+        self.fn = fn
+        self.required = required
+        self.ok: Optional[bool] = None
+        self.detail: Any = None
+        self.elapsed_ms = 0.0
+        self.attempts = 0
+
+    async def run(self):
+        self.attempts += 1
+        started = time.perf_counter()
+        try:
+            self.detail = await self.fn()
+            self.ok = True
+        except Exception as e:
+            self.detail = f"{type(e).__name__}: {e}"
+            self.ok = False
+            print(f"[WARMUP] {self.name} failed: {self.detail}")
+        self.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+
+class Warmup:
+    def __init__(self, retry_interval: float = 5.0):
+        self.steps: List[WarmupStep] = []
+        self.retry_interval = retry_interval
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._retry_task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, fn: Callable[[], Awaitable[Any]], required: bool = True):
+        self.steps.append(WarmupStep(name, fn, required))
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None and all(s.ok for s in self.steps if s.required)
+
+    async def run(self):
+        """모든 단계를 동시에 실행. 필수 단계 실패 시 재시도 태스크 시작"""
+        self.started_at = time.monotonic()
+        await asyncio.gather(*(s.run() for s in self.steps))
+        self.finished_at = time.monotonic()
+        print(f"[WARMUP] done in {(self.finished_at - self.started_at) * 1000:.0f}ms (ready={self.ready})")
+        if not self.ready:
+            self._retry_task = asyncio.create_task(self._retry_failed())
+
+    async def _retry_failed(self):
+        while not self.ready:
+            await asyncio.sleep(self.retry_interval)
+            await asyncio.gather(*(s.run() for s in self.steps if s.required and not s.ok))
+        print("[WARMUP] required steps recovered, ready")
+
+    async def stop(self):
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            try:
+                await self._retry_task
+            except asyncio.CancelledError:
+                pass
+            self._retry_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmup_ms": round((self.finished_at - self.started_at) * 1000, 1) if self.finished_at else None,
+            "steps": {
+                s.name: {"ok": s.ok, "required": s.required, "elapsed_ms": s.elapsed_ms,
+                         "attempts": s.attempts, "detail": s.detail}
+                for s in self.steps
+            },
+        }
+
+
+warmup = Warmup()
@@ -6,14 +6,86 @@ load_dotenv()
 class Config:
     # OpenAI 설정
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    OPENAI_API_MODEL = os.getenv("OPENAI_API_MODEL", "gpt-4")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # 가짜 업스트림 등으로 바꿀 때만
+    OPENAI_API_MODEL = os.getenv("OPENAI_API_MODEL", "gpt-4")  # 어려운 질문용 상위 모델
+    OPENAI_FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini")  # 기본 소형 모델
+    OPENAI_LATENCY_BUDGET_MS = float(os.getenv("OPENAI_LATENCY_BUDGET_MS", "4000"))
+    OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))  # 동시 요청 수
+    OPENAI_MAX_QUEUE = int(os.getenv("OPENAI_MAX_QUEUE", "200"))  # 대기열 상한 (초과 시 거절)
+    OPENAI_QUEUE_WAIT_RATIO = float(os.getenv("OPENAI_QUEUE_WAIT_RATIO", "0.5"))  # 타임아웃 중 대기열/한도 대기 허용 비율
+    OPENAI_EMBED_LINGER_MS = float(os.getenv("OPENAI_EMBED_LINGER_MS", "5"))  # 임베딩 묶음 대기시간
+    OPENAI_EMBED_MAX_BATCH = int(os.getenv("OPENAI_EMBED_MAX_BATCH", "64"))
     
     # Pinecone 설정
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     PINECONE_INDEX = os.getenv("PINECONE_INDEX")
-    PINECONE_INDEX_URL = os.getenv("PINECONE_INDEX_URL")
+    PINECONE_INDEX_URL = os.getenv("PINECONE_INDEX_URL")  # 설정 시 인덱스 조회/생성 없이 host 로 바로 연결
     PINECONE_EMBEDDING_MODEL = os.getenv("PINECONE_EMBEDDING_MODEL", "text-embedding-3-small")
     PINECONE_CLOUD = os.getenv("PINECONE_CLOUD", "aws")
     PINECONE_REGION = os.getenv("PINECONE_REGION", "us-west-1")
+    PINECONE_DEBUG_SAMPLE = os.getenv("PINECONE_DEBUG_SAMPLE", "false").lower() == "true"  # 워밍업 때 샘플 벡터 출력
+    PINECONE_DEBUG_RESULTS = os.getenv("PINECONE_DEBUG_RESULTS", "false").lower() == "true"  # 검색 결과 상점별 상세 출력
+
+    # 카카오 로컬 API
+    KAKAO_LOCAL_BASE_URL = os.getenv("KAKAO_LOCAL_BASE_URL", "https://dapi.kakao.com")
+
+    # 외부 의존성 타임아웃(초) / 헤지 요청
+    OPENAI_CHAT_TIMEOUT = float(os.getenv("OPENAI_CHAT_TIMEOUT", "20"))
+    OPENAI_EMBEDDING_TIMEOUT = float(os.getenv("OPENAI_EMBEDDING_TIMEOUT", "5"))
+    PINECONE_TIMEOUT = float(os.getenv("PINECONE_TIMEOUT", "5"))
+    KAKAO_LOCAL_TIMEOUT = float(os.getenv("KAKAO_LOCAL_TIMEOUT", "3"))
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+    HEDGE_RATIO = float(os.getenv("HEDGE_RATIO", "0.1"))  # 헤지 요청 상한 (전체 호출 대비 비율)
+    HEDGE_BURST = float(os.getenv("HEDGE_BURST", "10"))  # 한꺼번에 쓸 수 있는 헤지 수
+    HEDGE_MAX_ERROR_RATE = float(os.getenv("HEDGE_MAX_ERROR_RATE", "0.1"))  # 최근 실패율이 이보다 높으면 헤지 안 함
+
+    # 오프라인 지명 사전 (CSV)
+    GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "landmarks.csv"))
+
+    # 중복 스킬 요청(재시도/연타) 응답 재사용 시간(초)
+    IDEMPOTENCY_WINDOW = float(os.getenv("IDEMPOTENCY_WINDOW", "5"))
+
+    # 관리자 API (/admin/*) 토큰. 비어 있으면 관리자 API 비활성
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "200"))
+
+    # 트래픽 수집 (재생 부하 테스트용, 기본 꺼짐)
+    CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "false").lower() == "true"
+    CAPTURE_SAMPLE_RATE = float(os.getenv("CAPTURE_SAMPLE_RATE", "0.05"))  # 사용자 비율
+    CAPTURE_DIR = os.getenv("CAPTURE_DIR", "captures")
+    CAPTURE_SALT = os.getenv("CAPTURE_SALT", "")  # 사용자 ID 해시 키
+
+    # 추천 결과 페이지 ("더보기")
+    RECOMMEND_DEPTH = int(os.getenv("RECOMMEND_DEPTH", "30"))  # 한 번에 검색해 세션에 둘 후보 수
+    RECOMMEND_PAGE_SIZE = int(os.getenv("RECOMMEND_PAGE_SIZE", "5"))  # 캐러셀 1페이지 (카카오 최대 10)
+    RECOMMEND_CANDIDATE_CACHE = int(os.getenv("RECOMMEND_CANDIDATE_CACHE", "5000"))  # 카탈로그 밖 후보 보관 수
+    KAKAO_RECOMMEND_BLOCK_ID = os.getenv("KAKAO_RECOMMEND_BLOCK_ID", "")  # 더보기 버튼이 호출할 블록 (없으면 발화로)
+
+    # 대화/분석 이벤트 로그 (gzip JSONL, 백그라운드 기록)
+    EVENT_LOG_ENABLED = os.getenv("EVENT_LOG_ENABLED", "true").lower() == "true"
+    EVENT_LOG_DIR = os.getenv("EVENT_LOG_DIR", "logs/events")
+    EVENT_LOG_SALT = os.getenv("EVENT_LOG_SALT", "")  # 사용자 ID 해시 키
+    EVENT_LOG_MAX_QUEUE = int(os.getenv("EVENT_LOG_MAX_QUEUE", "20000"))
+    EVENT_LOG_OVERFLOW = os.getenv("EVENT_LOG_OVERFLOW", "drop_oldest")  # 큐가 찼을 때: drop_oldest / drop_new
+    EVENT_LOG_ROTATE_SECONDS = float(os.getenv("EVENT_LOG_ROTATE_SECONDS", "3600"))  # 세그먼트 교체 주기
+
+    # 지역 샤딩: geohash 접두어 단위로 상점을 노드에 나눔
+    SHARD_PRECISION = int(os.getenv("SHARD_PRECISION", "3"))  # 샤드 접두어 길이 (3 = 약 156km 칸)
+    GEO_INDEX_PRECISION = int(os.getenv("GEO_INDEX_PRECISION", "5"))  # 반경 검색용 칸 (5 = 약 5km)
+    LOCAL_SHARDS = os.getenv("LOCAL_SHARDS", "*")  # 이 노드 담당 접두어 (쉼표 구분, * = 전체)
+    SHARD_NODES = os.getenv("SHARD_NODES", "")  # 다른 노드: "wy6=http://10.0.0.2:8000,wv=http://10.0.0.3:8000"
+    SHARD_TIMEOUT = float(os.getenv("SHARD_TIMEOUT", "1.5"))
+    INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN", "")  # 노드 간 /internal/* 호출 토큰
+
+    # 서버 실행 설정
+    APP_ENV = os.getenv("APP_ENV", "development")  # production 이면 gunicorn 멀티 워커로 실행
+    SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", os.getenv("WEB_CONCURRENCY", "0")))  # 0 이면 CPU 코어 수
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))  # 0 이면 워커 재시작 안 함
+
+    # 상점 카탈로그를 마스터 프로세스에서 미리 로드할지 여부
+    CATALOG_PRELOAD = os.getenv("CATALOG_PRELOAD", "true").lower() == "true"
 
 config = Config()
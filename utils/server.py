@@ -0,0 +1,10 @@
+from uvicorn_worker import UvicornWorker
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """gunicorn 워커: uvloop 이벤트 루프 + httptools HTTP 파서 고정"""
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+    }